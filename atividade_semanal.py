@@ -0,0 +1,354 @@
+# Bibliotecas
+import numpy as np
+import pandas as pd
+from instrumentacao import instrumenta
+
+# =============================================================
+# Tabela de atividade semanal dos entregadores
+# =============================================================
+#
+# Pré-calcula o painel 'Pedidos por entregador por semana'. Cada célula é
+# um dia com uma combinação dos filtros da barra lateral e guarda a
+# quantidade de pedidos. Os entregadores são codificados por um dicionário
+# (código uint32) e os entregadores ativos em cada célula ficam em um único
+# array de pares (célula, entregador), ordenado por célula.
+#
+# A tabela não é menor que a base: na base sintética de 1M de linhas do
+# benchmark há praticamente um par por pedido (cada entregador faz poucos
+# pedidos por dia em cada combinação de filtros), e agrupar os pares por
+# semana em vez de dia quase não muda esse tamanho. O ganho está na
+# consulta: ela seleciona as células pelos filtros e faz a união dos
+# entregadores de cada semana em um bitmap semana x entregador, o que dá o
+# valor exato de pedidos por entregador sem reagrupar os pedidos.
+
+DIMENSOES = ['Road_traffic_density', 'Type_of_vehicle', 'Type_of_order',
+             'City', 'Weatherconditions']
+CHAVES = ['Order_Date', 'week_of_year'] + DIMENSOES
+
+# Acima deste tamanho (semanas x entregadores) a união usa np.unique
+LIMITE_BITMAP = 50_000_000
+
+# Tabela construída para a base atual do processo: (base, atividade)
+_construida = (None, None)
+
+
+def atividade_vazia():
+    """Tabela de atividade sem nenhum pedido"""
+    celulas = pd.DataFrame({'Order_Date': pd.Series(dtype='datetime64[ns]'),
+                            'week_of_year': pd.Series(dtype='int8'),
+                            **{dim: pd.Series(dtype='int16')
+                               for dim in DIMENSOES},
+                            'pedidos': pd.Series(dtype='int64')})
+    return {'entregadores': pd.Index([], dtype=object),
+            'categorias': {dim: pd.Index([], dtype=object)
+                           for dim in DIMENSOES},
+            'celulas': celulas,
+            'pares': pd.DataFrame({'celula': pd.Series(dtype='uint32'),
+                                   'entregador': pd.Series(dtype='uint32')}),
+            'assinaturas': pd.Series(dtype='uint64', index=pd.DatetimeIndex(
+                [], name='Order_Date'))}
+
+
+def _estende(dicionario, serie):
+    """Acrescenta ao dicionário os valores da série que ainda não estão nele"""
+    valores = pd.Index(pd.unique(np.asarray(serie, dtype=object)))
+    return dicionario.append(valores[~valores.isin(dicionario)])
+
+
+def _codifica(dicionario, serie):
+    """Códigos de uma série no dicionário (-1 para valores ausentes)"""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        posicoes = dicionario.get_indexer(serie.cat.categories)
+        codigos = serie.cat.codes.to_numpy()
+        return np.where(codigos >= 0, posicoes[codigos], -1)
+    return dicionario.get_indexer(np.asarray(serie, dtype=object))
+
+
+def _mistura(valores):
+    """Embaralha os bits de um array uint64 (finalizador do splitmix64)"""
+    valores = valores ^ (valores >> np.uint64(30))
+    valores = valores * np.uint64(0xBF58476D1CE4E5B9)
+    valores = valores ^ (valores >> np.uint64(27))
+    valores = valores * np.uint64(0x94D049BB133111EB)
+    return valores ^ (valores >> np.uint64(31))
+
+
+def _assinaturas(datas, codigos):
+    """Assinatura de cada dia: soma dos hashes dos códigos dos seus pedidos
+
+    A soma não depende da ordem das linhas, mas muda quando um pedido troca
+    de entregador ou de categoria, mesmo que o total do dia seja o mesmo.
+
+    Args:
+        datas (array): data de cada pedido
+        codigos (list): arrays de códigos de cada pedido (entregador e
+                        dimensões), com -1 para valores fora do dicionário
+
+    Returns:
+        Series: assinatura (uint64) indexada pela data
+    """
+    hashes = np.zeros(len(datas), dtype=np.uint64)
+    for codigo in codigos:
+        hashes = _mistura(hashes ^ np.asarray(codigo, dtype=np.int64
+                                              ).astype(np.uint64))
+    posicao, dias = pd.factorize(pd.DatetimeIndex(datas), sort=True)
+    soma = np.zeros(len(dias), dtype=np.uint64)
+    np.add.at(soma, posicao, hashes)
+    return pd.Series(soma, index=dias.rename('Order_Date'))
+
+
+def _soma_assinaturas(antigas, novas):
+    """Soma as assinaturas de dois grupos de pedidos, dia a dia"""
+    dias = antigas.index.union(novas.index)
+    soma = np.zeros(len(dias), dtype=np.uint64)
+    soma[dias.get_indexer(antigas.index)] += antigas.to_numpy()
+    soma[dias.get_indexer(novas.index)] += novas.to_numpy()
+    return pd.Series(soma, index=dias)
+
+
+def _numera_pares(pares, celulas, inicio):
+    """Troca as chaves de cada par pelo número da sua célula
+
+    Args:
+        pares (dataframe): colunas CHAVES e entregador, sem repetição
+        celulas (dataframe): células dos pares, na ordem da tabela
+        inicio (int): número da primeira célula de celulas
+
+    Returns:
+        dataframe: pares (celula, entregador) ordenados, em uint32
+    """
+    numeracao = celulas[CHAVES].reset_index(drop=True)
+    numeracao['celula'] = np.arange(inicio, inicio + len(numeracao))
+    pares = pares.merge(numeracao, on=CHAVES)[['celula', 'entregador']]
+    pares = pares.sort_values(['celula', 'entregador']).reset_index(drop=True)
+    return pares.astype('uint32')
+
+
+@instrumenta('atividade.atualizacao')
+def atualiza_atividade(atividade, df_novo):
+    """Acrescenta novos pedidos à tabela de atividade
+
+    Quando todos os pedidos novos são posteriores ao último dia da tabela
+    (o caso de atividade_da_base), as células novas são numeradas a partir
+    de len(celulas) e as células e os pares novos são acrescentados ao fim
+    das tabelas, sem reler o que já existe. Pedidos que caem em dias já
+    existentes passam pelo caminho geral, que recombina todas as células e
+    todos os pares da tabela.
+
+    Args:
+        atividade (dict): tabela atual (ou atividade_vazia())
+        df_novo (dataframe): novos pedidos tratados
+
+    Returns:
+        dict: nova tabela de atividade
+    """
+    entregadores = _estende(atividade['entregadores'],
+                            df_novo['Delivery_person_ID'])
+    categorias = {dim: _estende(atividade['categorias'][dim], df_novo[dim])
+                  for dim in DIMENSOES}
+
+    novos = pd.DataFrame({
+        'Order_Date': df_novo['Order_Date'].to_numpy(),
+        'week_of_year': df_novo['week_of_year'].to_numpy(),
+        **{dim: _codifica(categorias[dim], df_novo[dim]).astype('int16')
+           for dim in DIMENSOES},
+        'entregador': _codifica(entregadores, df_novo['Delivery_person_ID']
+                                ).astype('uint32')})
+
+    # Quantidade de pedidos por célula
+    celulas = atividade['celulas']
+    contagem = novos.groupby(CHAVES).size().rename('pedidos').reset_index()
+    depois_do_fim = (len(celulas) == 0 or len(novos) == 0
+                     or novos['Order_Date'].min()
+                     > celulas['Order_Date'].iloc[-1])
+    if depois_do_fim:
+        # Células novas no fim da tabela, numeradas a partir de len(celulas)
+        inicio = len(celulas)
+        celulas = pd.concat([celulas, contagem], ignore_index=True)
+        pares = _numera_pares(novos.drop_duplicates(), contagem, inicio)
+        pares = pd.concat([atividade['pares'], pares], ignore_index=True)
+    else:
+        celulas = pd.concat([celulas, contagem]).groupby(
+            CHAVES, as_index=False)['pedidos'].sum()
+
+        # Pares (célula, entregador) antigos e novos, sem repetição
+        antigos = atividade['celulas'].iloc[
+            atividade['pares']['celula'].to_numpy()][CHAVES].reset_index(
+                drop=True)
+        antigos['entregador'] = atividade['pares']['entregador'].to_numpy()
+        pares = _numera_pares(pd.concat([antigos, novos]).drop_duplicates(),
+                              celulas, 0)
+
+    assinaturas = _soma_assinaturas(atividade['assinaturas'], _assinaturas(
+        novos['Order_Date'].to_numpy(),
+        [novos[coluna].to_numpy() for coluna in ['entregador'] + DIMENSOES]))
+
+    return {'entregadores': entregadores, 'categorias': categorias,
+            'celulas': celulas, 'pares': pares, 'assinaturas': assinaturas}
+
+
+@instrumenta('atividade.construcao')
+def constroi_atividade(df2):
+    """Constrói a tabela de atividade a partir da base tratada
+
+    Args:
+        df2 (dataframe): base tratada (ou compacta), sem filtros
+
+    Returns:
+        dict: tabela de atividade
+    """
+    return atualiza_atividade(atividade_vazia(), df2)
+
+
+def recorta_atividade(atividade, data):
+    """Tabela de atividade só com os dias anteriores a uma data
+
+    As células estão ordenadas pela data e os pares pela célula, então o
+    recorte é um prefixo das duas tabelas e não precisa renumerar nada.
+
+    Args:
+        atividade (dict): tabela de atividade
+        data (datetime): primeiro dia removido
+
+    Returns:
+        dict: tabela com as células anteriores a data
+    """
+    qtd_celulas = int(np.searchsorted(
+        atividade['celulas']['Order_Date'].to_numpy(), np.datetime64(data)))
+    qtd_pares = int(np.searchsorted(
+        atividade['pares']['celula'].to_numpy(), qtd_celulas))
+    return {'entregadores': atividade['entregadores'],
+            'categorias': atividade['categorias'],
+            'celulas': atividade['celulas'].iloc[:qtd_celulas],
+            'pares': atividade['pares'].iloc[:qtd_pares],
+            'assinaturas': atividade['assinaturas'].loc[
+                atividade['assinaturas'].index < data]}
+
+
+def _mesmo_historico(atividade, df_antigo):
+    """Indica se os dias da tabela têm os mesmos pedidos da base
+
+    Compara as assinaturas de cada dia, que cobrem o entregador e as
+    dimensões de cada pedido, e não só a quantidade de pedidos.
+
+    Args:
+        atividade (dict): tabela recortada por recorta_atividade
+        df_antigo (dataframe): pedidos da base nova anteriores ao recorte
+
+    Returns:
+        bool: True se cada dia da tabela tem os mesmos pedidos da base
+    """
+    codigos = [_codifica(atividade['entregadores'],
+                         df_antigo['Delivery_person_ID'])]
+    codigos += [_codifica(atividade['categorias'][dim], df_antigo[dim])
+                for dim in DIMENSOES]
+    novas = _assinaturas(df_antigo['Order_Date'].to_numpy(), codigos)
+    antigas = atividade['assinaturas']
+    return (antigas.index.equals(novas.index)
+            and (antigas.to_numpy() == novas.to_numpy()).all())
+
+
+def atividade_da_base(df2):
+    """Tabela de atividade da base, atualizada quando a base muda
+
+    Quando chega uma base nova (outro snapshot ou outra versão do csv), o
+    último dia da tabela anterior é descartado, porque ainda podia estar
+    recebendo pedidos, e só os pedidos desse dia em diante são somados com
+    atualiza_atividade. A tabela só é reconstruída do zero quando algum dia
+    anterior mudou (pedidos novos ou removidos, outro entregador ou outra
+    categoria), o que é verificado pelas assinaturas de cada dia.
+
+    Args:
+        df2 (dataframe): base retornada por carrega_base, sem filtros
+
+    Returns:
+        dict: tabela de atividade
+    """
+    global _construida
+    base, atividade = _construida
+    if base is df2:
+        return atividade
+    if atividade is not None and len(atividade['celulas']):
+        ultimo = atividade['celulas']['Order_Date'].iloc[-1]
+        anteriores = recorta_atividade(atividade, ultimo)
+        novos = (df2['Order_Date'] >= ultimo).to_numpy()
+        colunas = ['Order_Date', 'Delivery_person_ID'] + DIMENSOES
+        if _mesmo_historico(anteriores, df2.loc[~novos, colunas]):
+            _construida = (df2, atualiza_atividade(anteriores,
+                                                   df2.loc[novos, :]))
+            return _construida[1]
+    _construida = (df2, constroi_atividade(df2))
+    return _construida[1]
+
+
+def _distintos_por_semana(semanas, entregadores, qtd_semanas,
+                          qtd_entregadores):
+    """Quantidade de entregadores distintos em cada semana
+
+    Args:
+        semanas (array): posição da semana de cada par selecionado
+        entregadores (array): código do entregador de cada par selecionado
+        qtd_semanas (int): quantidade de semanas
+        qtd_entregadores (int): tamanho do dicionário de entregadores
+
+    Returns:
+        array: entregadores distintos por semana
+    """
+    if qtd_semanas * qtd_entregadores <= LIMITE_BITMAP:
+        bitmap = np.zeros((qtd_semanas, qtd_entregadores), dtype=bool)
+        bitmap[semanas, entregadores] = True
+        return bitmap.sum(axis=1)
+    chaves = np.unique(semanas.astype(np.int64) * qtd_entregadores
+                       + entregadores)
+    return np.bincount(chaves // qtd_entregadores, minlength=qtd_semanas)
+
+
+@instrumenta('atividade.consulta')
+def pedidos_por_entregador_semana(atividade, date_slider, traffic_options,
+                                  vehicle_options, order_options,
+                                  city_options, weather_options):
+    """Pedidos por entregador em cada semana, para os filtros da barra lateral
+
+    Retorna o mesmo resultado de paineis.pedidos_por_entregador_semana
+    aplicado à base filtrada.
+
+    Args:
+        atividade (dict): tabela de atividade
+        date_slider (datetime): data limite dos pedidos
+        traffic_options (list): condições de trânsito selecionadas
+        vehicle_options (list): tipos de veículo selecionados
+        order_options (list): tipos de pedido selecionados
+        city_options (list): tipos de cidade selecionados
+        weather_options (list): condições climáticas selecionadas
+
+    Returns:
+        dataframe: colunas week_of_year, ID, Delivery_person_ID e
+                   order_by_delivery
+    """
+    celulas = atividade['celulas']
+    selecionadas = (celulas['Order_Date'] <= date_slider).to_numpy()
+    opcoes = [traffic_options, vehicle_options, order_options, city_options,
+              weather_options]
+    for dim, opcao in zip(DIMENSOES, opcoes):
+        codigos = atividade['categorias'][dim].get_indexer(
+            pd.Index(list(opcao), dtype=object))
+        selecionadas &= celulas[dim].isin(codigos[codigos >= 0]).to_numpy()
+
+    semanas = celulas['week_of_year'].to_numpy()
+    pedidos = pd.Series(celulas['pedidos'].to_numpy()[selecionadas]).groupby(
+        semanas[selecionadas]).sum()
+
+    pares = atividade['pares']
+    par_selecionado = selecionadas[pares['celula'].to_numpy()]
+    semana_par = semanas[pares['celula'].to_numpy()[par_selecionado]]
+    posicao = pedidos.index.get_indexer(semana_par)
+    distintos = _distintos_por_semana(
+        posicao, pares['entregador'].to_numpy()[par_selecionado],
+        len(pedidos), len(atividade['entregadores']))
+
+    df_aux = pd.DataFrame({'week_of_year': pedidos.index.to_numpy(),
+                           'ID': pedidos.to_numpy(),
+                           'Delivery_person_ID': distintos})
+    df_aux['order_by_delivery'] = df_aux['ID'] / \
+        df_aux['Delivery_person_ID']
+    return df_aux
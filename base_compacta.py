@@ -0,0 +1,116 @@
+# Bibliotecas
+import numpy as np
+import pandas as pd
+from instrumentacao import instrumenta
+
+# =============================================================
+# Base de pedidos compacta
+# =============================================================
+#
+# Depois do tratamento o dataframe ainda guarda todas as colunas brutas
+# (inclusive a coluna 'index' criada pelo reset_index), textos como object
+# e números em int64/float64. A base compacta mantém só as colunas usadas
+# pelo dashboard, com tipos numéricos reduzidos e textos codificados como
+# category (dicionário + códigos inteiros).
+
+# Colunas mantidas e seus tipos. None indica tratamento específico.
+COLUNAS = {
+    'ID': None,
+    'Delivery_person_ID': 'category',
+    'Delivery_person_Age': 'int8',
+    'Delivery_person_Ratings': 'float32',
+    'Delivery_location_latitude': 'float32',
+    'Delivery_location_longitude': 'float32',
+    'Order_Date': 'datetime64[ns]',
+    'Weatherconditions': 'category',
+    'Road_traffic_density': 'category',
+    'Vehicle_condition': 'int8',
+    'Type_of_order': 'category',
+    'Type_of_vehicle': 'category',
+    'multiple_deliveries': 'int8',
+    'Festival': 'category',
+    'City': 'category',
+    'Time_taken(min)': 'int16',
+    'week_of_year': 'int8',
+    'distancia': 'float32',
+}
+
+# Valor de cada dígito hexadecimal, indexado pelo código ascii
+_HEX = np.full(256, -1, dtype=np.int64)
+_HEX[np.frombuffer(b'0123456789', dtype=np.uint8)] = np.arange(10)
+_HEX[np.frombuffer(b'abcdef', dtype=np.uint8)] = np.arange(10, 16)
+_HEX[np.frombuffer(b'ABCDEF', dtype=np.uint8)] = np.arange(10, 16)
+
+
+def codifica_id(serie):
+    """Codifica o ID do pedido ('0x4607') como inteiro
+
+    A conversão é vetorizada: os textos viram uma matriz de bytes e cada
+    dígito é convertido por uma tabela. Se algum ID não for hexadecimal, a
+    coluna é codificada como category.
+
+    Args:
+        serie (Series): IDs dos pedidos, sem espaços
+
+    Returns:
+        Series: IDs como inteiros (ou category)
+    """
+    hexadecimal = serie.str.startswith('0x').all()
+    digitos = serie.str.slice(2)
+    largura = digitos.str.len().max() if len(serie) else 0
+    if not hexadecimal or not 0 < largura <= 15:
+        return serie.astype('category')
+
+    matriz = np.array(digitos.str.zfill(largura).tolist(),
+                      dtype=f'S{largura}').view(np.uint8).reshape(-1, largura)
+    valores = _HEX[matriz]
+    if (valores < 0).any():
+        return serie.astype('category')
+    pesos = 16 ** np.arange(largura - 1, -1, -1, dtype=np.int64)
+    return pd.Series(valores @ pesos, index=serie.index).astype(
+        np.min_scalar_type(16 ** largura - 1))
+
+
+def converte_tipo(serie, tipo):
+    """Converte uma coluna para o tipo declarado, sem perder valores
+
+    Se algum inteiro não couber no tipo declarado, usa o menor tipo inteiro
+    que comporte todos os valores.
+
+    Args:
+        serie (Series): coluna do dataframe tratado
+        tipo (str): tipo declarado em COLUNAS
+
+    Returns:
+        Series: coluna convertida
+    """
+    if tipo in ('int8', 'int16', 'int32'):
+        limites = np.iinfo(tipo)
+        if len(serie) and (serie.min() < limites.min
+                           or serie.max() > limites.max):
+            return pd.to_numeric(serie, downcast='integer')
+    return serie.astype(tipo)
+
+
+@instrumenta('compactacao')
+def compacta_dataframe(df2):
+    """Projeta as colunas usadas e reduz os tipos do dataframe tratado
+
+    Args:
+        df2 (dataframe): dataframe retornado por tratamento_dataframe
+
+    Returns:
+        dataframe: base compacta com as colunas de COLUNAS
+    """
+    base = {}
+    for coluna, tipo in COLUNAS.items():
+        if coluna == 'ID':
+            base[coluna] = codifica_id(df2[coluna])
+        else:
+            base[coluna] = converte_tipo(df2[coluna], tipo)
+    return pd.DataFrame(base)
+
+
+def memoria_dataframe(df):
+    """Memória ocupada por um dataframe em bytes, incluindo os textos"""
+    return int(df.memory_usage(deep=True).sum())
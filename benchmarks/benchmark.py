@@ -0,0 +1,306 @@
+# Bibliotecas
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import datetime
+import tracemalloc
+import pandas as pd
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(RAIZ)
+
+from gera_dados import gera_csv  # noqa: E402
+from funcoes import carrega_dataframe, tratamento_dataframe, aplica_filtros  # noqa: E402
+from paineis import PAINEIS  # noqa: E402
+from base_compacta import compacta_dataframe, memoria_dataframe  # noqa: E402
+import atividade_semanal  # noqa: E402
+from exporta_relatorios import calcula_grade  # noqa: E402
+from qualidade import REGRAS, avalia_regras, valida_dataframe  # noqa: E402
+import previsao  # noqa: E402
+
+# =============================================================
+# Benchmarks de carga, limpeza, filtros e painéis do dashboard
+# =============================================================
+#
+# Uso:
+#   python benchmarks/benchmark.py --linhas 10000 100000
+#   python benchmarks/benchmark.py --compara benchmarks/resultados/base.json
+#
+# Os resultados são salvos em json (um arquivo por execução) para comparar
+# o desempenho entre commits.
+
+
+def cronometra(funcao, repeticoes, preparo=None):
+    """Mede o tempo de execução de uma função
+
+    Args:
+        funcao (function): função medida, recebe o retorno de preparo
+        repeticoes (int): quantidade de execuções
+        preparo (function): função executada fora da medição antes de cada
+                            execução (por exemplo, copiar o dataframe)
+
+    Returns:
+        tuple: dicionário com os tempos em segundos e o último retorno
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        entrada = preparo() if preparo is not None else None
+        inicio = time.perf_counter()
+        retorno = funcao(entrada) if preparo is not None else funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return {'min': min(tempos),
+            'media': float(np.mean(tempos)),
+            'mediana': float(np.median(tempos))}, retorno
+
+
+def pico_memoria(funcao):
+    """Pico de memória alocada (em bytes) durante uma execução da função"""
+    tracemalloc.start()
+    try:
+        funcao()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def filtros_padrao(df2):
+    """Filtros da barra lateral no estado inicial das páginas
+
+    Args:
+        df2 (dataframe): dataframe tratado
+
+    Returns:
+        dict: argumentos para aplica_filtros com todas as opções marcadas
+    """
+    return {'date_slider': df2['Order_Date'].max(),
+            'traffic_options': df2['Road_traffic_density'].unique(),
+            'vehicle_options': df2['Type_of_vehicle'].unique(),
+            'order_options': df2['Type_of_order'].unique(),
+            'city_options': df2['City'].unique(),
+            'weather_options': df2['Weatherconditions'].unique()}
+
+
+def executa_benchmark(arquivo, repeticoes=3):
+    """Executa todas as etapas do dashboard sobre um csv
+
+    Args:
+        arquivo (str): caminho do csv no formato bruto do train.csv
+        repeticoes (int): execuções de cada etapa
+
+    Returns:
+        dict: tempos e quantidade de linhas de cada etapa
+    """
+    path, nome = os.path.split(arquivo)
+    resultado = {}
+
+    tempo, df1 = cronometra(lambda: carrega_dataframe(path + '/', nome),
+                            repeticoes)
+    resultado['carga'] = dict(tempo, linhas=len(df1))
+
+    tempo, df2 = cronometra(tratamento_dataframe, repeticoes,
+                            preparo=df1.copy)
+    resultado['tratamento'] = dict(tempo, linhas=len(df2))
+
+    # Regras de qualidade, medidas sobre a base tratada sem validação
+    df_bruto = tratamento_dataframe(df1.copy(), validar=False)
+    tempo, (_, _, relatorio) = cronometra(lambda: valida_dataframe(df_bruto),
+                                          repeticoes)
+    resultado['qualidade'] = dict(tempo, linhas=len(df_bruto),
+                                  rejeicoes=relatorio)
+
+    tempo, df_compacto = cronometra(lambda: compacta_dataframe(df2),
+                                    repeticoes)
+    resultado['compactacao'] = dict(tempo, linhas=len(df_compacto))
+    resultado['memoria'] = {
+        'tratado': memoria_dataframe(df2),
+        'compacto': memoria_dataframe(df_compacto),
+        'razao': memoria_dataframe(df2) / memoria_dataframe(df_compacto)}
+    df2 = df_compacto
+
+    filtros = filtros_padrao(df2)
+    tempo, df_filtrado = cronometra(lambda: aplica_filtros(df2, **filtros),
+                                    repeticoes)
+    resultado['filtros'] = dict(tempo, linhas=len(df_filtrado))
+
+    for pagina, paineis in PAINEIS.items():
+        for nome_painel, painel in paineis.items():
+            tempo, _ = cronometra(lambda: painel(df_filtrado), repeticoes)
+            resultado[f'{pagina}.{nome_painel}'] = tempo
+
+    # Tabela de atividade semanal: construção, atualização com a última
+    # semana e consulta com os mesmos filtros
+    tempo, atividade = cronometra(
+        lambda: atividade_semanal.constroi_atividade(df2), repeticoes)
+    resultado['atividade.construcao'] = tempo
+    ultima = df2['week_of_year'] == df2['week_of_year'].max()
+    anterior = atividade_semanal.constroi_atividade(df2.loc[~ultima, :])
+    tempo, _ = cronometra(lambda: atividade_semanal.atualiza_atividade(
+        anterior, df2.loc[ultima, :]), repeticoes)
+    resultado['atividade.atualizacao'] = tempo
+    tempo, _ = cronometra(lambda: atividade_semanal.pedidos_por_entregador_semana(
+        atividade, **filtros), repeticoes)
+    resultado['atividade.consulta'] = tempo
+
+    # Exportação em lote: todos os painéis para até 1000 combinações de
+    # filtros (sem a escrita dos arquivos)
+    grade = ['City', 'week_of_year', 'Road_traffic_density',
+             'Type_of_vehicle', 'Type_of_order']
+    tempo, combinacoes = cronometra(
+        lambda: calcula_grade(df2, grade, limite=1000), repeticoes)
+    resultado['exportacao.grade_1000'] = dict(tempo,
+                                              combinacoes=len(combinacoes))
+
+    # Modelo de previsão: treino, previsão em lote da base filtrada e
+    # previsão de um pedido por vez (tempo médio por pedido)
+    tempo, modelo = cronometra(lambda: previsao.treina_modelo(df2),
+                               repeticoes)
+    resultado['previsao.treino'] = dict(
+        tempo, linhas=len(df2),
+        memoria_pico=pico_memoria(lambda: previsao.treina_modelo(df2)))
+    tempo, _ = cronometra(lambda: previsao.preve_tempo(df_filtrado, modelo),
+                          repeticoes)
+    resultado['previsao.lote'] = dict(
+        tempo, linhas=len(df_filtrado),
+        linhas_por_segundo=len(df_filtrado) / tempo['mediana'],
+        memoria_pico=pico_memoria(
+            lambda: previsao.preve_tempo(df_filtrado, modelo)))
+    colunas = previsao.NUMERICAS + previsao.CATEGORICAS
+    pedidos = df_filtrado[colunas].head(1000).astype(object).to_dict('records')
+    tempo, _ = cronometra(lambda: [previsao.preve_pedido(pedido, modelo)
+                                   for pedido in pedidos], repeticoes)
+    resultado['previsao.pedido'] = {chave: valor / len(pedidos)
+                                    for chave, valor in tempo.items()}
+    return resultado
+
+
+def benchmark_qualidade(arquivo, linhas, repeticoes=3):
+    """Mede as regras de qualidade em uma base grande
+
+    Só as colunas usadas pelas regras são replicadas até a quantidade de
+    linhas pedida, o que permite medir dezenas de milhões de linhas sem
+    montar a base tratada inteira na memória.
+
+    Args:
+        arquivo (str): caminho do csv no formato bruto do train.csv
+        linhas (int): quantidade de linhas da base replicada
+        repeticoes (int): execuções de cada etapa
+
+    Returns:
+        dict: tempos da avaliação das regras e da separação das linhas
+    """
+    path, nome = os.path.split(arquivo)
+    df2 = tratamento_dataframe(carrega_dataframe(path + '/', nome),
+                               validar=False)
+    colunas = list(dict.fromkeys(coluna for _, cols, _ in REGRAS.values()
+                                 for coluna in cols))
+    posicoes = np.arange(linhas) % len(df2)
+    df_grande = pd.DataFrame({coluna: df2[coluna].to_numpy()[posicoes]
+                              for coluna in colunas})
+    del df2
+
+    resultado = {}
+    tempo, _ = cronometra(lambda: avalia_regras(df_grande), repeticoes)
+    resultado['qualidade.regras'] = dict(
+        tempo, linhas=linhas, ns_por_linha=tempo['mediana'] / linhas * 1e9)
+    tempo, _ = cronometra(lambda: valida_dataframe(df_grande), repeticoes)
+    resultado['qualidade.validacao'] = dict(
+        tempo, linhas=linhas, ns_por_linha=tempo['mediana'] / linhas * 1e9)
+    return resultado
+
+
+def commit_atual():
+    """Hash do commit atual, ou None fora de um repositório git"""
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       cwd=RAIZ, text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compara(atual, base):
+    """Imprime a razão entre os tempos de duas execuções
+
+    Args:
+        atual (dict): resultado da execução atual
+        base (dict): resultado salvo de uma execução anterior
+    """
+    print(f"{'etapa':<50}{'base (s)':>12}{'atual (s)':>12}{'razão':>8}")
+    for linhas, etapas in atual['resultados'].items():
+        etapas_base = base['resultados'].get(linhas, {})
+        for etapa, tempo in etapas.items():
+            if 'mediana' not in tempo or etapa not in etapas_base:
+                continue
+            t_base = etapas_base[etapa]['mediana']
+            t_atual = tempo['mediana']
+            razao = t_atual / t_base if t_base > 0 else float('nan')
+            print(f'{linhas + " " + etapa:<50}{t_base:>12.4f}'
+                  f'{t_atual:>12.4f}{razao:>8.2f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Benchmarks do dashboard Cury Company')
+    parser.add_argument('--linhas', type=int, nargs='+',
+                        default=[10_000, 100_000])
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--dados', default=os.path.join(RAIZ, 'benchmarks',
+                                                        'dados'))
+    parser.add_argument('--saida', default=None)
+    parser.add_argument('--compara', default=None,
+                        help='json de uma execução anterior')
+    parser.add_argument('--qualidade', type=int, default=None,
+                        help='linhas da base replicada para medir as regras '
+                             'de qualidade (por exemplo 10000000)')
+    args = parser.parse_args()
+
+    resultados = {}
+    for linhas in args.linhas:
+        arquivo = os.path.join(args.dados, f'train_{linhas}.csv')
+        if not os.path.exists(arquivo):
+            gera_csv(arquivo, linhas)
+        print(f'Executando benchmark com {linhas} linhas...')
+        resultados[str(linhas)] = executa_benchmark(arquivo, args.repeticoes)
+    if args.qualidade is not None:
+        print(f'Executando regras de qualidade com {args.qualidade} linhas...')
+        resultados[f'qualidade_{args.qualidade}'] = benchmark_qualidade(
+            arquivo, args.qualidade, args.repeticoes)
+
+    atual = {'commit': commit_atual(),
+             'data': datetime.datetime.now().isoformat(timespec='seconds'),
+             'python': platform.python_version(),
+             'pandas': pd.__version__,
+             'numpy': np.__version__,
+             'repeticoes': args.repeticoes,
+             'resultados': resultados}
+
+    saida = args.saida
+    if saida is None:
+        saida = os.path.join(RAIZ, 'benchmarks', 'resultados',
+                             f"{atual['commit'] or 'sem_commit'}.json")
+    os.makedirs(os.path.dirname(saida), exist_ok=True)
+    with open(saida, 'w') as f:
+        json.dump(atual, f, indent=2)
+    print(f'Resultados salvos em {saida}')
+
+    if args.compara is not None:
+        with open(args.compara) as f:
+            compara(atual, json.load(f))
+    else:
+        for linhas, etapas in resultados.items():
+            for etapa, tempo in etapas.items():
+                if 'mediana' in tempo:
+                    print(f"{linhas + ' ' + etapa:<50}"
+                          f"{tempo['mediana']:>12.4f}")
+            if 'memoria' not in etapas:
+                continue
+            memoria = etapas['memoria']
+            print(f"{linhas + ' memória tratado/compacto (MB)':<50}"
+                  f"{memoria['tratado'] / 2**20:>12.1f}"
+                  f"{memoria['compacto'] / 2**20:>12.1f}"
+                  f"{memoria['razao']:>8.1f}x")
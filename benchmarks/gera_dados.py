@@ -0,0 +1,216 @@
+# Bibliotecas
+import os
+import argparse
+import numpy as np
+import pandas as pd
+
+# =============================================================
+# Gerador de dados sintéticos no formato bruto de dados/train.csv
+# =============================================================
+#
+# Reproduz o esquema e as peculiaridades que tratamento_dataframe espera:
+# textos com espaço no final, sentinelas 'NaN ' e 'conditions NaN' e o
+# tempo de entrega no formato '(min) 24'. A geração é vetorizada e escrita
+# em blocos, então funciona para 10M+ linhas sem estourar a memória.
+
+COLUNAS = ['ID', 'Delivery_person_ID', 'Delivery_person_Age',
+           'Delivery_person_Ratings', 'Restaurant_latitude',
+           'Restaurant_longitude', 'Delivery_location_latitude',
+           'Delivery_location_longitude', 'Order_Date', 'Time_Orderd',
+           'Time_Order_picked', 'Weatherconditions', 'Road_traffic_density',
+           'Vehicle_condition', 'Type_of_order', 'Type_of_vehicle',
+           'multiple_deliveries', 'Festival', 'City', 'Time_taken(min)']
+
+CIDADES = ['Metropolitian ', 'Urban ', 'Semi-Urban ']
+PROB_CIDADES = [0.75, 0.22, 0.03]
+TRAFEGO = ['Low ', 'Jam ', 'Medium ', 'High ']
+PROB_TRAFEGO = [0.34, 0.31, 0.24, 0.11]
+CLIMA = ['conditions Sunny', 'conditions Stormy', 'conditions Sandstorms',
+         'conditions Cloudy', 'conditions Fog', 'conditions Windy']
+PEDIDOS = ['Snack ', 'Meal ', 'Drinks ', 'Buffet ']
+VEICULOS = ['motorcycle ', 'scooter ', 'electric_scooter ', 'bicycle ']
+PROB_VEICULOS = [0.58, 0.33, 0.08, 0.01]
+
+# Cidades de origem dos códigos de entregador e suas coordenadas
+ORIGENS = {'INDO': (22.75, 75.89), 'BANG': (12.97, 77.59),
+           'COIMB': (11.02, 76.99), 'CHEN': (13.08, 80.27),
+           'HYD': (17.45, 78.38), 'RANCHI': (23.36, 85.33),
+           'MYS': (12.31, 76.65), 'DEH': (30.33, 78.04),
+           'KOC': (9.96, 76.29), 'PUNE': (18.53, 73.85),
+           'LUDH': (30.90, 75.80), 'KNP': (26.46, 80.33),
+           'MUM': (19.17, 72.84), 'KOL': (22.55, 88.35),
+           'JAP': (26.91, 75.79), 'SUR': (21.18, 72.83),
+           'GOA': (15.51, 73.83), 'AURG': (19.88, 75.32),
+           'AGR': (27.16, 78.01), 'VAD': (22.31, 73.18),
+           'ALH': (25.44, 81.84), 'BHP': (23.23, 77.40)}
+
+# Tabelas de textos já formatados, indexadas por valores inteiros
+HORARIOS = np.array([f'{m // 60 % 24:02d}:{m % 60:02d}:00'
+                     for m in range(25 * 60)], dtype=object)
+TEMPOS = np.array([f'(min) {t}' for t in range(100)], dtype=object)
+NUMEROS = np.array([str(n) for n in range(100)], dtype=object)
+
+
+def gera_entregadores(qtd, rng):
+    """Gera o cadastro de entregadores com ID, idade, avaliação e origem
+
+    Args:
+        qtd (int): quantidade de entregadores
+        rng (Generator): gerador de números aleatórios
+
+    Returns:
+        dataframe: uma linha por entregador
+    """
+    siglas = np.array(list(ORIGENS.keys()))
+    coords = np.array(list(ORIGENS.values()))
+    origem = rng.integers(0, len(siglas), qtd)
+    sequencia = np.arange(qtd)
+    ids = (pd.Series(siglas[origem]) + 'RES'
+           + pd.Series(sequencia // 4 + 1).astype(str).str.zfill(2)
+           + 'DEL'
+           + pd.Series(sequencia % 4 + 1).astype(str).str.zfill(2)
+           + ' ')
+    avaliacao = np.round(rng.uniform(3.5, 5.0, qtd), 1)
+    return pd.DataFrame({'Delivery_person_ID': ids.to_numpy(dtype=object),
+                         'idade': NUMEROS[rng.integers(20, 40, qtd)],
+                         'avaliacao': avaliacao.astype(str).astype(object),
+                         'lat': coords[origem, 0],
+                         'lon': coords[origem, 1]})
+
+
+def gera_bloco(inicio, qtd, entregadores, datas, rng, taxa_nan=0.03,
+               taxa_coord_zero=0.01, taxa_coord_negativa=0.01,
+               taxa_entregador_invalido=0.005):
+    """Gera um bloco de pedidos no formato bruto do train.csv
+
+    Args:
+        inicio (int): número do primeiro pedido do bloco (usado no ID)
+        qtd (int): quantidade de pedidos do bloco
+        entregadores (dataframe): cadastro gerado por gera_entregadores
+        datas (array): datas possíveis para os pedidos, já formatadas
+        rng (Generator): gerador de números aleatórios
+        taxa_nan (float): proporção de sentinelas de dado faltante por coluna
+        taxa_coord_zero (float): proporção de restaurantes em (0, 0)
+        taxa_coord_negativa (float): proporção de coordenadas com sinal trocado
+        taxa_entregador_invalido (float): proporção de pedidos com idade 15 e
+                                          avaliação 6, como no train.csv
+
+    Returns:
+        dataframe: bloco com as colunas de COLUNAS
+    """
+    def faltante(valores, sentinela):
+        valores = valores.copy()
+        valores[rng.random(qtd) < taxa_nan] = sentinela
+        return valores
+
+    def escolhe(opcoes, p=None):
+        return np.array(opcoes, dtype=object)[
+            rng.choice(len(opcoes), qtd, p=p)]
+
+    ent = entregadores.iloc[rng.integers(0, len(entregadores), qtd)]
+
+    # Coordenadas do restaurante e do local de entrega
+    rest_lat = np.round(ent['lat'].to_numpy() + rng.normal(0, 0.05, qtd), 6)
+    rest_lon = np.round(ent['lon'].to_numpy() + rng.normal(0, 0.05, qtd), 6)
+    entr_lat = np.round(rest_lat + rng.uniform(0.01, 0.13, qtd), 6)
+    entr_lon = np.round(rest_lon + rng.uniform(0.01, 0.13, qtd), 6)
+    zero = rng.random(qtd) < taxa_coord_zero
+    rest_lat[zero] = 0.0
+    rest_lon[zero] = 0.0
+    entr_lat[zero] = np.round(rng.uniform(0.01, 0.13, zero.sum()), 6)
+    entr_lon[zero] = np.round(rng.uniform(0.01, 0.13, zero.sum()), 6)
+    negativa = ~zero & (rng.random(qtd) < taxa_coord_negativa)
+    rest_lat[negativa] = -rest_lat[negativa]
+    rest_lon[negativa] = -rest_lon[negativa]
+
+    # Idade e avaliação impossíveis
+    invalido = rng.random(qtd) < taxa_entregador_invalido
+    idade = np.where(invalido, 15, ent['idade'].to_numpy())
+    avaliacao = np.where(invalido, 6.0, ent['avaliacao'].to_numpy())
+
+    # Horários do pedido e da coleta
+    minuto = rng.integers(8 * 60, 24 * 60 - 15, qtd)
+    coleta = minuto + rng.choice([5, 10, 15], qtd)
+
+    trafego = rng.choice(len(TRAFEGO), qtd, p=PROB_TRAFEGO)
+    multiplas = rng.choice(4, qtd, p=[0.31, 0.62, 0.05, 0.02])
+    festival = rng.random(qtd) < 0.02
+    tempo = np.clip(np.round(15 + 3 * trafego + 4 * multiplas + 20 * festival
+                             + rng.normal(0, 6, qtd)), 10, 54).astype(int)
+
+    bloco = pd.DataFrame({
+        'ID': (pd.Series(np.arange(inicio, inicio + qtd)).map(hex) + ' '
+               ).to_numpy(),
+        'Delivery_person_ID': ent['Delivery_person_ID'].to_numpy(),
+        'Delivery_person_Age': faltante(idade.astype(object), 'NaN '),
+        'Delivery_person_Ratings': faltante(avaliacao.astype(object), 'NaN '),
+        'Restaurant_latitude': rest_lat,
+        'Restaurant_longitude': rest_lon,
+        'Delivery_location_latitude': entr_lat,
+        'Delivery_location_longitude': entr_lon,
+        'Order_Date': datas[rng.integers(0, len(datas), qtd)],
+        'Time_Orderd': faltante(HORARIOS[minuto], 'NaN '),
+        'Time_Order_picked': HORARIOS[coleta],
+        'Weatherconditions': faltante(escolhe(CLIMA), 'conditions NaN'),
+        'Road_traffic_density': faltante(
+            np.array(TRAFEGO, dtype=object)[trafego], 'NaN '),
+        'Vehicle_condition': rng.integers(0, 4, qtd),
+        'Type_of_order': escolhe(PEDIDOS),
+        'Type_of_vehicle': escolhe(VEICULOS, PROB_VEICULOS),
+        'multiple_deliveries': faltante(NUMEROS[multiplas], 'NaN '),
+        'Festival': faltante(np.where(festival, 'Yes ', 'No ').astype(object),
+                             'NaN '),
+        'City': faltante(escolhe(CIDADES, PROB_CIDADES), 'NaN '),
+        'Time_taken(min)': TEMPOS[tempo],
+    })
+    return bloco[COLUNAS]
+
+
+def gera_csv(arquivo, linhas, entregadores=None, data_inicial='2022-02-11',
+             dias=55, seed=42, tamanho_bloco=1_000_000, **taxas):
+    """Escreve um csv sintético com o esquema bruto do train.csv
+
+    Args:
+        arquivo (str): caminho do csv de saída
+        linhas (int): quantidade de pedidos
+        entregadores (int): quantidade de entregadores (padrão: linhas/30)
+        data_inicial (str): data do primeiro pedido
+        dias (int): quantidade de dias cobertos pelos pedidos
+        seed (int): semente do gerador aleatório
+        tamanho_bloco (int): linhas geradas e escritas por vez
+        **taxas: taxas repassadas para gera_bloco
+
+    Returns:
+        str: caminho do csv gerado
+    """
+    rng = np.random.default_rng(seed)
+    if entregadores is None:
+        entregadores = max(linhas // 30, 10)
+    cadastro = gera_entregadores(entregadores, rng)
+    datas = np.array(pd.date_range(data_inicial, periods=dias,
+                                   freq='D').strftime('%d-%m-%Y'))
+
+    pasta = os.path.dirname(arquivo)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    for inicio in range(0, linhas, tamanho_bloco):
+        qtd = min(tamanho_bloco, linhas - inicio)
+        bloco = gera_bloco(inicio, qtd, cadastro, datas, rng, **taxas)
+        bloco.to_csv(arquivo, mode='w' if inicio == 0 else 'a',
+                     header=inicio == 0, index=False)
+    return arquivo
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Gera um train.csv sintético para os benchmarks')
+    parser.add_argument('--linhas', type=int, default=100_000)
+    parser.add_argument('--saida', default='benchmarks/dados/train.csv')
+    parser.add_argument('--entregadores', type=int, default=None)
+    parser.add_argument('--dias', type=int, default=55)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    gera_csv(args.saida, args.linhas, entregadores=args.entregadores,
+             dias=args.dias, seed=args.seed)
+    print(f'{args.linhas} linhas escritas em {args.saida}')
@@ -0,0 +1,175 @@
+# Bibliotecas
+import os
+import re
+import time
+import argparse
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from memoria_compartilhada import carrega_base
+from paineis import PAINEIS
+
+# =============================================================
+# Exportação em lote dos painéis do dashboard
+# =============================================================
+#
+# Calcula todos os painéis das três páginas para cada combinação de uma
+# grade de filtros (por padrão cidade x semana) e grava uma pasta (csv) ou
+# uma planilha (xlsx) por combinação. Em vez de refiltrar a base e repetir
+# os painéis para cada combinação, cada painel é calculado uma vez com as
+# colunas da grade no agrupamento (argumento grade de paineis) e separado
+# por combinação; a escrita é feita em paralelo.
+#
+# Uso:
+#   python exporta_relatorios.py --grade City week_of_year --destino relatorios/
+
+GRADE_PADRAO = ['City', 'week_of_year']
+# xlsx depende do openpyxl, que é opcional
+FORMATOS = ['csv'] + (['xlsx'] if importlib.util.find_spec('openpyxl') else [])
+
+
+def calcula_grade(df2, grade=GRADE_PADRAO, limite=None):
+    """Calcula todos os painéis para cada combinação da grade
+
+    Cada painel é calculado uma única vez para a base inteira, com as
+    colunas da grade no início do agrupamento, e o resultado é separado por
+    combinação. As colunas da grade entram com o prefixo 'grade_' para não
+    colidir com as colunas agrupadas pelos próprios painéis.
+
+    Args:
+        df2 (dataframe): base compacta, sem filtros
+        grade (list): colunas que definem as combinações
+        limite (int): quantidade máxima de combinações (None para todas)
+
+    Returns:
+        list: pares (combinação, {página.painel: dataframe})
+    """
+    colunas = [f'grade_{coluna}' for coluna in grade]
+    base = df2.assign(**{nova: df2[coluna]
+                         for nova, coluna in zip(colunas, grade)})
+    if limite is not None:
+        numero = base.groupby(colunas, observed=True, sort=True).ngroup()
+        base = base.loc[numero.to_numpy() < limite, :]
+
+    chaves = base[colunas].drop_duplicates().sort_values(colunas)
+    chaves = chaves.reset_index(drop=True).reset_index(names='combinacao')
+    combinacoes = [{coluna: getattr(chave, nova) for coluna, nova
+                    in zip(grade, colunas)}
+                   for chave in chaves.itertuples(index=False)]
+    resultados = [{} for _ in combinacoes]
+    for pagina, paineis in PAINEIS.items():
+        for nome, painel in paineis.items():
+            tabela = painel(base, grade=colunas)
+
+            # Linhas de cada combinação como fatias contíguas
+            numero = tabela[colunas].merge(chaves, how='left', on=colunas)
+            ordem = numero['combinacao'].to_numpy().argsort(kind='stable')
+            tabela = tabela.drop(columns=colunas).iloc[ordem]
+            limites = numero['combinacao'].to_numpy()[ordem].searchsorted(
+                range(len(combinacoes) + 1))
+            for i, resultado in enumerate(resultados):
+                resultado[f'{pagina}.{nome}'] = tabela.iloc[
+                    limites[i]:limites[i + 1]].reset_index(drop=True)
+    return list(zip(combinacoes, resultados))
+
+
+def nome_combinacao(combinacao):
+    """Nome de arquivo de uma combinação, por exemplo City-Urban_week_of_year-7"""
+    partes = [f'{coluna}-{valor}' for coluna, valor in combinacao.items()]
+    return re.sub(r'[^\w.-]+', '-', '_'.join(partes))
+
+
+def nomes_abas(tabelas):
+    """Nome da aba do xlsx de cada painel: o nome sem a página
+
+    O Excel limita os nomes a 31 caracteres e o ExcelWriter grava abas com
+    o mesmo nome uma sobre a outra, então nomes repetidos são um erro.
+
+    Args:
+        tabelas (dict): tabelas dos painéis, por 'página.painel'
+
+    Returns:
+        dict: nome da aba de cada painel
+    """
+    abas = {painel: painel.split('.', 1)[-1][:31] for painel in tabelas}
+    repetidas = sorted({aba for aba in abas.values()
+                        if list(abas.values()).count(aba) > 1})
+    if repetidas:
+        raise ValueError(f'Nomes de aba repetidos: {repetidas}')
+    return abas
+
+
+def escreve_combinacao(destino, combinacao, tabelas, formato):
+    """Grava as tabelas de uma combinação
+
+    Args:
+        destino (str): pasta de saída
+        combinacao (dict): valores das colunas da grade
+        tabelas (dict): tabelas dos painéis
+        formato (str): 'csv' (uma pasta com um csv por painel) ou 'xlsx'
+                       (uma planilha com uma aba por painel)
+
+    Returns:
+        str: caminho gravado
+    """
+    nome = nome_combinacao(combinacao)
+    if formato == 'csv':
+        pasta = os.path.join(destino, nome)
+        os.makedirs(pasta, exist_ok=True)
+        for painel, tabela in tabelas.items():
+            tabela.to_csv(os.path.join(pasta, f'{painel}.csv'), index=False)
+        return pasta
+    if formato == 'xlsx':
+        abas = nomes_abas(tabelas)
+        caminho = os.path.join(destino, f'{nome}.xlsx')
+        with pd.ExcelWriter(caminho) as planilha:
+            for painel, tabela in tabelas.items():
+                tabela.to_excel(planilha, sheet_name=abas[painel], index=False)
+        return caminho
+    raise ValueError(f'Formato desconhecido: {formato}')
+
+
+def escreve_resultados(resultados, destino, formato='csv', processos=None):
+    """Grava os resultados de calcula_grade em paralelo
+
+    Args:
+        resultados (list): retorno de calcula_grade
+        destino (str): pasta de saída
+        formato (str): 'csv' ou 'xlsx'
+        processos (int): quantidade de processos (padrão: número de CPUs)
+
+    Returns:
+        list: caminhos gravados
+    """
+    os.makedirs(destino, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        futuros = [executor.submit(escreve_combinacao, destino, combinacao,
+                                   tabelas, formato)
+                   for combinacao, tabelas in resultados]
+        return [futuro.result() for futuro in futuros]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Exporta os painéis do dashboard para uma grade de filtros')
+    parser.add_argument('--dados', default='dados/')
+    parser.add_argument('--arquivo', default='train.csv')
+    parser.add_argument('--grade', nargs='+', default=GRADE_PADRAO)
+    parser.add_argument('--destino', default='relatorios/')
+    parser.add_argument('--formato', choices=FORMATOS, default='csv')
+    parser.add_argument('--processos', type=int, default=None)
+    parser.add_argument('--limite', type=int, default=None,
+                        help='quantidade máxima de combinações')
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    df2 = carrega_base(args.dados, args.arquivo)
+    carga = time.perf_counter()
+    resultados = calcula_grade(df2, args.grade, args.limite)
+    calculo = time.perf_counter()
+    escreve_resultados(resultados, args.destino, args.formato, args.processos)
+    fim = time.perf_counter()
+
+    print(f'{len(resultados)} combinações exportadas em {args.destino}')
+    print(f'carga: {carga - inicio:.2f}s | painéis: {calculo - carga:.2f}s | '
+          f'escrita: {fim - calculo:.2f}s | total: {fim - inicio:.2f}s')
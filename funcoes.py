@@ -0,0 +1,125 @@
+# Bibliotecas
+import pandas as pd
+from haversine import haversine_vector
+from instrumentacao import instrumenta
+from qualidade import QUARENTENA, valida_dataframe, grava_quarentena
+
+# =============================================================
+# Funções compartilhadas pelas páginas do dashboard
+# =============================================================
+
+
+@instrumenta('carga')
+def carrega_dataframe(path='dados/', arquivo='train.csv'):
+    """ Função para carregar o dataframe para a memória
+
+    Args:
+        path (str): pasta onde está a base de dados
+        arquivo (str): nome do arquivo csv
+
+    Returns:
+        dataframe: retorna dataframe com a base carregada
+    """
+    df = pd.read_csv(path + arquivo)
+    df1 = df.copy()
+    return df1
+
+
+@instrumenta('tratamento')
+def tratamento_dataframe(df1, validar=True, quarentena=QUARENTENA):
+    """Função para fazer o tratamento e limpeza da base de dados
+    1. Retira espaços em branco das variáveis de texto
+    2. Retira dados faltantes
+    3. Ajusta formato das variáveis
+    4. Retira texto da variável de tempo (numérica)
+    5. Cria variável de semana do ano
+    6. Cria variável de distância da entrega
+    7. Retira linhas que violam as regras de qualidade (qualidade.REGRAS)
+
+    Args:
+        df1 (dataframe): leitura do dataframe carregado na memória
+        validar (bool): aplica as regras de qualidade
+        quarentena (str): csv onde gravar as linhas rejeitadas pelas regras
+                          (padrão: variável de ambiente CURY_QUARENTENA)
+
+    Returns:
+        dataframe: retorna dataframe com todas as limpezas e tratamentos
+    """
+
+    # Retirando espaços em branco das variáveis categóricas
+    df1.loc[:, 'ID'] = df1.loc[:, 'ID'].str.strip()
+    df1.loc[:, 'Delivery_person_ID'] = df1.loc[:,
+                                               'Delivery_person_ID'].str.strip()
+    df1.loc[:, 'Road_traffic_density'] = df1.loc[:,
+                                                 'Road_traffic_density'].str.strip()
+    df1.loc[:, 'Type_of_order'] = df1.loc[:, 'Type_of_order'].str.strip()
+    df1.loc[:, 'Type_of_vehicle'] = df1.loc[:, 'Type_of_vehicle'].str.strip()
+    df1.loc[:, 'Festival'] = df1.loc[:, 'Festival'].str.strip()
+    df1.loc[:, 'City'] = df1.loc[:, 'City'].str.strip()
+
+    # Retirando dados faltantes
+    df1 = df1[(df1['Delivery_person_Age'] != 'NaN ')
+              & (df1['multiple_deliveries'] != 'NaN ')
+              & (df1['Road_traffic_density'] != 'NaN')
+              & (df1['City'] != 'NaN')
+              & (df1['Weatherconditions'] != 'conditions NaN')
+              & (df1['Festival'] != 'NaN')
+              ].reset_index(drop=True)
+
+    # Ajustando o formato das variáveis
+    df1['Delivery_person_Age'] = df1['Delivery_person_Age'].astype('int64')
+    df1['Delivery_person_Ratings'] = df1['Delivery_person_Ratings'].astype(
+        float)
+    df1['Order_Date'] = pd.to_datetime(df1['Order_Date'], format='%d-%m-%Y')
+    df1['multiple_deliveries'] = df1['multiple_deliveries'].astype('int64')
+
+    # Retirando texto (min) da coluna de tempo de entrega
+    df1['Time_taken(min)'] = df1['Time_taken(min)'].apply(
+        lambda x: x.split('(min) ')[1])
+    df1['Time_taken(min)'] = df1['Time_taken(min)'].astype('int64')
+
+    # Criando variável do dia da semana
+    df1['week_of_year'] = df1['Order_Date'].dt.strftime('%U')
+    df1['week_of_year'] = df1['week_of_year'].astype('int64')
+
+    # Criando variavel de distancia
+    df1['distancia'] = haversine_vector(
+        df1[['Restaurant_latitude', 'Restaurant_longitude']].to_numpy(),
+        df1[['Delivery_location_latitude', 'Delivery_location_longitude']].to_numpy())
+
+    # Retirando coordenadas, avaliações e idades impossíveis
+    if validar:
+        df1, df_rejeitado, _ = valida_dataframe(df1)
+        df1 = df1.reset_index(drop=True)
+        if quarentena:
+            grava_quarentena(df_rejeitado, quarentena)
+
+    df1 = df1.reset_index()
+    df2 = df1.copy()
+    return df2
+
+
+@instrumenta('filtros')
+def aplica_filtros(df2, date_slider, traffic_options, vehicle_options,
+                   order_options, city_options, weather_options):
+    """Função para aplicar os filtros da barra lateral
+
+    Args:
+        df2 (dataframe): dataframe tratado
+        date_slider (datetime): data limite dos pedidos
+        traffic_options (list): condições de trânsito selecionadas
+        vehicle_options (list): tipos de veículo selecionados
+        order_options (list): tipos de pedido selecionados
+        city_options (list): tipos de cidade selecionados
+        weather_options (list): condições climáticas selecionadas
+
+    Returns:
+        dataframe: retorna dataframe apenas com as linhas selecionadas
+    """
+    df2 = df2.loc[df2['Order_Date'] <= date_slider, :]
+    df2 = df2.loc[df2['Road_traffic_density'].isin(traffic_options), :]
+    df2 = df2.loc[df2['Type_of_vehicle'].isin(vehicle_options), :]
+    df2 = df2.loc[df2['Type_of_order'].isin(order_options), :]
+    df2 = df2.loc[df2['City'].isin(city_options), :]
+    df2 = df2.loc[df2['Weatherconditions'].isin(weather_options), :]
+    return df2
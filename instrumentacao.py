@@ -0,0 +1,194 @@
+# Bibliotecas
+import os
+import json
+import time
+import threading
+import functools
+from contextlib import contextmanager
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# =============================================================
+# Instrumentação das etapas do dashboard
+# =============================================================
+#
+# Mede tempo, linhas de entrada e saída e variação de memória de cada etapa
+# (carga, limpeza, filtros, agregações e blocos das páginas). O registro é
+# por thread, já que o Streamlit executa cada sessão em uma thread própria,
+# e só fica ativo quando a variável de ambiente CURY_DEBUG=1 está definida.
+
+DEBUG = os.environ.get('CURY_DEBUG', '0') == '1'
+
+_local = threading.local()
+
+
+def memoria_rss():
+    """Memória residente do processo em bytes, ou None se indisponível"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _linhas(objeto):
+    """Quantidade de linhas de um dataframe, ou None para outros objetos"""
+    return len(objeto) if hasattr(objeto, 'columns') else None
+
+
+def inicia_registro(ativo=DEBUG):
+    """Inicia um novo registro de medições na thread atual
+
+    Args:
+        ativo (bool): se False, mede e instrumenta não registram nada
+    """
+    _local.ativo = ativo
+    _local.registros = []
+    _local.origem = time.perf_counter()
+
+
+def registro_ativo():
+    """Indica se há um registro de medições ativo na thread atual"""
+    return getattr(_local, 'ativo', False)
+
+
+def registros():
+    """Medições registradas na thread atual"""
+    return list(getattr(_local, 'registros', []))
+
+
+@contextmanager
+def mede(etapa, entrada=None):
+    """Mede o tempo e a memória de um bloco de código
+
+    Para registrar as linhas de saída, atribua o resultado a medida['saida']
+    dentro do bloco.
+
+    Args:
+        etapa (str): nome da etapa
+        entrada (dataframe): dataframe de entrada da etapa
+
+    Yields:
+        dict: medida da etapa, completada ao final do bloco
+    """
+    if not registro_ativo():
+        yield {}
+        return
+
+    medida = {'etapa': etapa, 'linhas_entrada': _linhas(entrada)}
+    memoria = memoria_rss()
+    inicio = time.perf_counter()
+    try:
+        yield medida
+    finally:
+        fim = time.perf_counter()
+        memoria_final = memoria_rss()
+        medida['linhas_saida'] = _linhas(medida.pop('saida', None))
+        medida['inicio'] = inicio - _local.origem
+        medida['tempo'] = fim - inicio
+        medida['memoria_delta'] = (memoria_final - memoria
+                                   if memoria is not None else None)
+        medida['thread'] = threading.get_ident()
+        _local.registros.append(medida)
+
+
+def instrumenta(etapa=None):
+    """Decorador que mede cada chamada de uma função
+
+    O primeiro argumento da função é tratado como dataframe de entrada e o
+    retorno como dataframe de saída.
+
+    Args:
+        etapa (str): nome da etapa (padrão: nome da função)
+
+    Returns:
+        function: decorador
+    """
+    def decorador(funcao):
+        nome = etapa or funcao.__name__
+
+        @functools.wraps(funcao)
+        def envoltorio(*args, **kwargs):
+            if not registro_ativo():
+                return funcao(*args, **kwargs)
+            with mede(nome, args[0] if args else None) as medida:
+                retorno = funcao(*args, **kwargs)
+                medida['saida'] = retorno
+            return retorno
+        return envoltorio
+    return decorador
+
+
+def exporta_log(medidas):
+    """Exporta as medições como log estruturado (uma linha json por etapa)
+
+    Args:
+        medidas (list): medições retornadas por registros()
+
+    Returns:
+        str: log em formato json lines
+    """
+    return '\n'.join(json.dumps(medida) for medida in medidas)
+
+
+def exporta_chrome_trace(medidas):
+    """Exporta as medições no formato Trace Event do Chrome
+
+    O arquivo pode ser aberto em chrome://tracing ou no Perfetto.
+
+    Args:
+        medidas (list): medições retornadas por registros()
+
+    Returns:
+        str: json com a lista traceEvents
+    """
+    eventos = [{'name': medida['etapa'],
+                'ph': 'X',
+                'ts': medida['inicio'] * 1e6,
+                'dur': medida['tempo'] * 1e6,
+                'pid': os.getpid(),
+                'tid': medida['thread'],
+                'args': {'linhas_entrada': medida['linhas_entrada'],
+                         'linhas_saida': medida['linhas_saida'],
+                         'memoria_delta': medida['memoria_delta']}}
+               for medida in medidas]
+    return json.dumps({'traceEvents': eventos, 'displayTimeUnit': 'ms'})
+
+
+def mostra_registros():
+    """Mostra as medições da execução atual em um expander na barra lateral
+
+    Não faz nada se o registro não estiver ativo.
+    """
+    if not registro_ativo():
+        return
+    import pandas as pd
+    import streamlit as st
+
+    medidas = registros()
+    with st.sidebar.expander('Debug: tempo por etapa'):
+        df_aux = pd.DataFrame(medidas, columns=['etapa', 'tempo',
+                                                'linhas_entrada',
+                                                'linhas_saida',
+                                                'memoria_delta'])
+        df_aux['tempo'] = df_aux['tempo'] * 1000
+        df_aux['memoria_delta'] = df_aux['memoria_delta'] / 2**20
+        st.dataframe(df_aux, hide_index=True, use_container_width=True,
+                     column_config={
+                         'etapa': 'Etapa',
+                         'tempo': st.column_config.NumberColumn(
+                             'Tempo (ms)', format='%.1f'),
+                         'linhas_entrada': 'Linhas entrada',
+                         'linhas_saida': 'Linhas saída',
+                         'memoria_delta': st.column_config.NumberColumn(
+                             'Memória (MB)', format='%.1f')})
+        st.download_button('Exportar log', exporta_log(medidas),
+                           file_name='instrumentacao.jsonl')
+        st.download_button('Exportar Chrome trace',
+                           exporta_chrome_trace(medidas),
+                           file_name='instrumentacao_trace.json')
@@ -0,0 +1,203 @@
+# Bibliotecas
+import os
+import json
+import time
+import shutil
+import argparse
+import numpy as np
+import pandas as pd
+from funcoes import carrega_dataframe, tratamento_dataframe
+from base_compacta import compacta_dataframe
+from instrumentacao import instrumenta
+from qualidade import QUARENTENA
+
+# =============================================================
+# Base compacta compartilhada entre processos
+# =============================================================
+#
+# Um processo carregador monta a base compacta uma única vez e a publica
+# como um snapshot: uma pasta com um arquivo .npy por coluna (códigos
+# inteiros no caso das colunas category) e um meta.json com os tipos e as
+# categorias. Os servidores do Streamlit abrem os arquivos com memory map
+# somente leitura, então todas as páginas de todos os processos usam as
+# mesmas páginas de memória do sistema operacional, sem cópia.
+#
+# A publicação é atômica: o snapshot é escrito em uma pasta temporária,
+# renomeado e só então o arquivo ATUAL passa a apontar para ele. Quem já
+# está usando o snapshot anterior continua com ele até a próxima execução.
+#
+# Uso:
+#   python memoria_compartilhada.py --destino snapshots/
+#   CURY_SNAPSHOT=snapshots/ streamlit run Home.py
+
+PASTA_SNAPSHOT = os.environ.get('CURY_SNAPSHOT')
+ARQUIVO_ATUAL = 'ATUAL'
+MANTER_SNAPSHOTS = 2
+
+# Base aberta por este processo: (versão do snapshot ou do csv, dataframe)
+_aberto = (None, None)
+
+
+def publica_snapshot(df, destino, manter=MANTER_SNAPSHOTS):
+    """Publica a base compacta como um novo snapshot
+
+    Args:
+        df (dataframe): base retornada por compacta_dataframe
+        destino (str): pasta dos snapshots
+        manter (int): quantidade de snapshots antigos mantidos no disco
+
+    Returns:
+        str: versão publicada
+    """
+    os.makedirs(destino, exist_ok=True)
+    versao = f'{time.time_ns()}_{os.getpid()}'
+    temporaria = os.path.join(destino, f'.{versao}.tmp')
+    os.makedirs(temporaria)
+
+    meta = {'linhas': len(df), 'colunas': []}
+    for numero, coluna in enumerate(df.columns):
+        serie = df[coluna]
+        arquivo = f'{numero:02d}.npy'
+        info = {'nome': coluna, 'arquivo': arquivo, 'tipo': str(serie.dtype)}
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            info['categorias'] = serie.cat.categories.tolist()
+            valores = serie.cat.codes.to_numpy()
+        else:
+            valores = serie.to_numpy()
+        np.save(os.path.join(temporaria, arquivo), valores)
+        meta['colunas'].append(info)
+    with open(os.path.join(temporaria, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+
+    os.rename(temporaria, os.path.join(destino, versao))
+    ponteiro = os.path.join(destino, f'.{ARQUIVO_ATUAL}.{versao}.tmp')
+    with open(ponteiro, 'w') as f:
+        f.write(versao)
+    os.replace(ponteiro, os.path.join(destino, ARQUIVO_ATUAL))
+
+    limpa_snapshots(destino, manter)
+    return versao
+
+
+def limpa_snapshots(destino, manter=MANTER_SNAPSHOTS):
+    """Remove snapshots antigos, mantendo o atual e os manter anteriores
+
+    Em sistemas POSIX os processos que ainda usam um snapshot removido
+    continuam lendo os dados até liberar o memory map.
+
+    Args:
+        destino (str): pasta dos snapshots
+        manter (int): quantidade de snapshots antigos mantidos
+    """
+    atual = versao_atual(destino)
+    versoes = sorted(nome for nome in os.listdir(destino)
+                     if not nome.startswith('.') and nome != ARQUIVO_ATUAL
+                     and nome != atual)
+    for versao in versoes[:max(len(versoes) - manter, 0)]:
+        shutil.rmtree(os.path.join(destino, versao), ignore_errors=True)
+
+
+def versao_atual(destino):
+    """Versão apontada pelo arquivo ATUAL, ou None se não houver snapshot"""
+    try:
+        with open(os.path.join(destino, ARQUIVO_ATUAL)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def abre_snapshot(destino, versao):
+    """Abre um snapshot como dataframe somente leitura, sem copiar os dados
+
+    Args:
+        destino (str): pasta dos snapshots
+        versao (str): versão a abrir
+
+    Returns:
+        dataframe: base compacta apoiada nos arquivos do snapshot
+    """
+    pasta = os.path.join(destino, versao)
+    with open(os.path.join(pasta, 'meta.json')) as f:
+        meta = json.load(f)
+
+    colunas = {}
+    for info in meta['colunas']:
+        valores = np.load(os.path.join(pasta, info['arquivo']), mmap_mode='r')
+        if 'categorias' in info:
+            valores = pd.Categorical.from_codes(valores, info['categorias'])
+        colunas[info['nome']] = valores
+    return pd.DataFrame(colunas, copy=False)
+
+
+@instrumenta('snapshot')
+def base_publicada(destino=PASTA_SNAPSHOT):
+    """Base do snapshot atual, reaproveitando o já aberto pelo processo
+
+    Args:
+        destino (str): pasta dos snapshots
+
+    Returns:
+        dataframe: base compacta, ou None se ainda não houver snapshot
+    """
+    global _aberto
+    versao = versao_atual(destino)
+    if versao is None:
+        return None
+    if _aberto[0] != versao:
+        _aberto = (versao, abre_snapshot(destino, versao))
+    return _aberto[1]
+
+
+def carrega_base(path='dados/', arquivo='train.csv'):
+    """Base compacta usada pelas páginas
+
+    Com CURY_SNAPSHOT definida usa o snapshot publicado; caso contrário (ou
+    enquanto nenhum snapshot foi publicado) carrega e trata o csv. A base do
+    csv é reaproveitada pelo processo enquanto o arquivo não mudar.
+
+    Args:
+        path (str): pasta onde está a base de dados
+        arquivo (str): nome do arquivo csv
+
+    Returns:
+        dataframe: base compacta
+    """
+    global _aberto
+    if PASTA_SNAPSHOT is not None:
+        df2 = base_publicada(PASTA_SNAPSHOT)
+        if df2 is not None:
+            return df2
+    versao = (path + arquivo, os.path.getmtime(path + arquivo))
+    if _aberto[0] != versao:
+        df1 = carrega_dataframe(path, arquivo)
+        _aberto = (versao, compacta_dataframe(tratamento_dataframe(df1)))
+    return _aberto[1]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Publica a base compacta para os servidores do dashboard')
+    parser.add_argument('--dados', default='dados/')
+    parser.add_argument('--arquivo', default='train.csv')
+    parser.add_argument('--destino', default=PASTA_SNAPSHOT or 'snapshots/')
+    parser.add_argument('--intervalo', type=float, default=None,
+                        help='segundos entre verificações do csv; sem este '
+                             'argumento publica uma vez e termina')
+    parser.add_argument('--quarentena', default=QUARENTENA,
+                        help='csv onde gravar as linhas rejeitadas pelas '
+                             'regras de qualidade')
+    args = parser.parse_args()
+
+    caminho = os.path.join(args.dados, args.arquivo)
+    modificado = None
+    while True:
+        if os.path.getmtime(caminho) != modificado:
+            modificado = os.path.getmtime(caminho)
+            df1 = carrega_dataframe(args.dados, args.arquivo)
+            df2 = compacta_dataframe(
+                tratamento_dataframe(df1, quarentena=args.quarentena))
+            versao = publica_snapshot(df2, args.destino)
+            print(f'Snapshot {versao} publicado com {len(df2)} linhas')
+        if args.intervalo is None:
+            break
+        time.sleep(args.intervalo)
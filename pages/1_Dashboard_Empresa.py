@@ -1,93 +1,20 @@
 # Bibliotecas
-import pandas as pd
 import datetime
 import plotly.express as px
 import folium
-from haversine import haversine
 import streamlit as st
 from PIL import Image
+from funcoes import aplica_filtros
+from memoria_compartilhada import carrega_base
+import paineis
+from atividade_semanal import atividade_da_base, pedidos_por_entregador_semana
+from reducao import reduz_serie, modo_renderizacao
+from instrumentacao import inicia_registro, mede, mostra_registros
 from streamlit_folium import folium_static
 
-# =============================================================
-# Funções
-# =============================================================
-
-
-def carrega_dataframe():
-    """ Função para carregar o dataframe para a memória
-
-    Returns:
-        dataframe: retorna dataframe com a base carregada
-    """
-    path = 'dados/'
-    df = pd.read_csv(path + 'train.csv')
-    df1 = df.copy()
-    return df1
-
-
-def tratamento_dataframe(df1):
-    """Função para fazer o tratamento e limpeza da base de dados
-    1. Retira espaços em branco das variáveis de texto
-    2. Retira dados faltantes
-    3. Ajusta formato das variáveis
-    4. Retira texto da variável de tempo (numérica)
-    5. Cria variável de semana do ano
-    6. Cria variável de distância da entrega
-
-    Args:
-        df1 (dataframe): leitura do dataframe carregado na memória
-
-    Returns:
-        dataframe: retorna dataframe com todas as limpezas e tratamentos
-    """
-
-    # Retirando espaços em branco das variáveis categóricas
-    df1.loc[:, 'ID'] = df1.loc[:, 'ID'].str.strip()
-    df1.loc[:, 'Delivery_person_ID'] = df1.loc[:,
-                                               'Delivery_person_ID'].str.strip()
-    df1.loc[:, 'Road_traffic_density'] = df1.loc[:,
-                                                 'Road_traffic_density'].str.strip()
-    df1.loc[:, 'Type_of_order'] = df1.loc[:, 'Type_of_order'].str.strip()
-    df1.loc[:, 'Type_of_vehicle'] = df1.loc[:, 'Type_of_vehicle'].str.strip()
-    df1.loc[:, 'Festival'] = df1.loc[:, 'Festival'].str.strip()
-    df1.loc[:, 'City'] = df1.loc[:, 'City'].str.strip()
-
-    # Retirando dados faltantes
-    df1 = df1[(df1['Delivery_person_Age'] != 'NaN ')
-              & (df1['multiple_deliveries'] != 'NaN ')
-              & (df1['Road_traffic_density'] != 'NaN')
-              & (df1['City'] != 'NaN')
-              & (df1['Weatherconditions'] != 'conditions NaN')
-              & (df1['Festival'] != 'NaN')
-              ].reset_index(drop=True)
-
-    # Ajustando o formato das variáveis
-    df1['Delivery_person_Age'] = df1['Delivery_person_Age'].astype('int64')
-    df1['Delivery_person_Ratings'] = df1['Delivery_person_Ratings'].astype(
-        float)
-    df1['Order_Date'] = pd.to_datetime(df1['Order_Date'], format='%d-%m-%Y')
-    df1['multiple_deliveries'] = df1['multiple_deliveries'].astype('int64')
-
-    # Retirando texto (min) da coluna de tempo de entrega
-    df1['Time_taken(min)'] = df1['Time_taken(min)'].apply(
-        lambda x: x.split('(min) ')[1])
-    df1['Time_taken(min)'] = df1['Time_taken(min)'].astype('int64')
-
-    # Criando variável do dia da semana
-    df1['week_of_year'] = df1['Order_Date'].dt.strftime('%U')
-    df1['week_of_year'] = df1['week_of_year'].astype('int64')
-
-    # Criando variavel de distancia
-    df1['distancia'] = df1.apply(lambda x: haversine((x['Restaurant_latitude'], x['Restaurant_longitude']),
-                                                     (x['Delivery_location_latitude'], x['Delivery_location_longitude'])), axis=1)
-
-    df1 = df1.reset_index()
-    df2 = df1.copy()
-    return df2
-
-
-df1 = carrega_dataframe()
-df2 = tratamento_dataframe(df1)
+inicia_registro()
+df2 = carrega_base()
+atividade = atividade_da_base(df2)
 
 
 # =======================================================
@@ -124,32 +51,32 @@ date_slider = st.sidebar.slider('',
 st.sidebar.markdown('---')
 st.sidebar.markdown('### Selecione as condições de trânsito')
 traffic_options = st.sidebar.multiselect('',
-                                         df2['Road_traffic_density'].unique(),
-                                         default=df2['Road_traffic_density'].unique())
+                                         df2['Road_traffic_density'].unique().tolist(),
+                                         default=df2['Road_traffic_density'].unique().tolist())
 
 st.sidebar.markdown('---')
 st.sidebar.markdown('### Selecione o tipo de veículo')
 vehicle_options = st.sidebar.multiselect('',
-                                         df2['Type_of_vehicle'].unique(),
-                                         default=df2['Type_of_vehicle'].unique())
+                                         df2['Type_of_vehicle'].unique().tolist(),
+                                         default=df2['Type_of_vehicle'].unique().tolist())
 
 st.sidebar.markdown('---')
 st.sidebar.markdown('### Selecione o tipo de pedido')
 order_options = st.sidebar.multiselect('',
-                                       df2['Type_of_order'].unique(),
-                                       default=df2['Type_of_order'].unique())
+                                       df2['Type_of_order'].unique().tolist(),
+                                       default=df2['Type_of_order'].unique().tolist())
 
 st.sidebar.markdown('---')
 st.sidebar.markdown('### Selecione o tipo de cidade')
 city_options = st.sidebar.multiselect('',
-                                      df2['City'].unique(),
-                                      default=df2['City'].unique())
+                                      df2['City'].unique().tolist(),
+                                      default=df2['City'].unique().tolist())
 
 st.sidebar.markdown('---')
 st.sidebar.markdown('### Selecione as condições climáticas')
 weather_options = st.sidebar.multiselect('',
-                                         df2['Weatherconditions'].unique(),
-                                         default=df2['Weatherconditions'].unique())
+                                         df2['Weatherconditions'].unique().tolist(),
+                                         default=df2['Weatherconditions'].unique().tolist())
 
 
 st.sidebar.markdown('---')
@@ -162,12 +89,8 @@ st.sidebar.markdown('---')
 #  APLICANDO FILTROS
 # =======================================================
 
-df2 = df2.loc[df2['Order_Date'] <= date_slider, :]
-df2 = df2.loc[df2['Road_traffic_density'].isin(traffic_options), :]
-df2 = df2.loc[df2['Type_of_vehicle'].isin(vehicle_options), :]
-df2 = df2.loc[df2['Type_of_order'].isin(order_options), :]
-df2 = df2.loc[df2['City'].isin(city_options), :]
-df2 = df2.loc[df2['Weatherconditions'].isin(weather_options), :]
+df2 = aplica_filtros(df2, date_slider, traffic_options, vehicle_options,
+                   order_options, city_options, weather_options)
 
 
 # =======================================================
@@ -177,11 +100,10 @@ tab1, tab2, tab3 = st.tabs(
     ['Visão Gerencial', 'Visão Estratégica', 'Visão Geográfica'])
 
 with tab1:
-    with st.container():
+    with st.container(), mede('Pedidos por dia'):
         st.markdown('##### Pedidos por dia')
-        df_aux = df2[['Order_Date', 'ID']].groupby(
-            ['Order_Date']).count().reset_index()
-        df_aux.columns = ['Order_Date', 'qtd_entregas']
+        df_aux = reduz_serie(paineis.pedidos_por_dia(df2), 'Order_Date',
+                             'qtd_entregas', metodo='minmax')
         fig = px.bar(df_aux, x='Order_Date', y='qtd_entregas', labels={'Order_Date': 'Data do pedido',
                                                                        'qtd_entregas': 'Qtd entregas'
                                                                        })
@@ -189,25 +111,16 @@ with tab1:
 
     with st.container():
         col1, col2 = st.columns(2, gap='large')
-        with col1:
+        with col1, mede('Pedidos por densidade de tráfego'):
             st.markdown('##### Pedidos por densidade de tráfego')
-            df_aux = df2[['Road_traffic_density', 'ID']].groupby(
-                ['Road_traffic_density']).count().reset_index()
-            df_aux.columns = ['Road_traffic_density', 'qtd_entregas']
-            df_aux['perc_ID'] = 100 * \
-                (df_aux['qtd_entregas']/df_aux['qtd_entregas'].sum())
+            df_aux = paineis.pedidos_por_trafego(df2)
             fig = px.pie(df_aux, values='perc_ID', names='Road_traffic_density', labels={'Road_traffic_density': 'Densidade de tráfego',
                                                                                          'perc_ID': '% entregas'
                                                                                          })
             st.plotly_chart(fig, use_container_width=True)
-        with col2:
+        with col2, mede('Pedidos por densidade de tráfego e cidade'):
             st.markdown('##### Pedidos por densidade de tráfego e cidade')
-            df_aux = df2[['Road_traffic_density', 'City', 'ID']].groupby(
-                ['City', 'Road_traffic_density']).count().reset_index()
-            df_aux.columns = ['Road_traffic_density', 'City', 'qtd_entregas']
-            df_aux['perc_ID'] = 100 * \
-                (df_aux['qtd_entregas']/df_aux['qtd_entregas'].sum())
-
+            df_aux = paineis.pedidos_por_trafego_cidade(df2)
             fig = px.bar(df_aux, x='City', y='qtd_entregas', color='Road_traffic_density', barmode='group', labels={'Road_traffic_density': 'Densidade de tráfego',
                                                                                                                     'City': 'Cidade',
                                                                                                                     'qtd_entregas': 'Qtd entregas'})
@@ -215,44 +128,28 @@ with tab1:
 
 
 with tab2:
-    with st.container():
+    with st.container(), mede('Pedidos por semana'):
         st.markdown('##### Pedidos por semana')
-        df_aux = df2[['week_of_year', 'ID']].groupby(
-            ['week_of_year']).count().reset_index()
-        df_aux.columns = ['week_of_year', 'qtd_entregas']
-        fig = px.line(df_aux, x='week_of_year', y='qtd_entregas', labels={'week_of_year': 'Semana do ano',
-                                                                          'qtd_entregas': 'Qtd entregas'
-                                                                          })
+        df_aux = reduz_serie(paineis.pedidos_por_semana(df2), 'week_of_year',
+                             'qtd_entregas')
+        fig = px.line(df_aux, x='week_of_year', y='qtd_entregas', render_mode=modo_renderizacao(df_aux), labels={'week_of_year': 'Semana do ano',
+                                                                                                                'qtd_entregas': 'Qtd entregas'
+                                                                                                                })
         st.plotly_chart(fig, use_container_width=True)
 
-    with st.container():
+    with st.container(), mede('Pedidos por entregador por semana'):
         st.markdown('##### Pedidos por entregador por semana')
-        df_aux1 = df2.loc[:, ['ID', 'week_of_year']].groupby(
-            'week_of_year').count().reset_index()
-        df_aux2 = df2.loc[:, ['Delivery_person_ID', 'week_of_year']].groupby(
-            'week_of_year').nunique().reset_index()
-        df_aux = pd.merge(df_aux1, df_aux2, how='inner')
-        df_aux['order_by_delivery'] = df_aux['ID'] / \
-            df_aux['Delivery_person_ID']
-        fig = px.line(df_aux, x='week_of_year', y='order_by_delivery', labels={'week_of_year': 'Semana do ano',
-                                                                               'order_by_delivery': 'Pedidos por entregador'})
+        df_aux = pedidos_por_entregador_semana(atividade, date_slider, traffic_options, vehicle_options,
+                                               order_options, city_options, weather_options)
+        df_aux = reduz_serie(df_aux, 'week_of_year', 'order_by_delivery')
+        fig = px.line(df_aux, x='week_of_year', y='order_by_delivery', render_mode=modo_renderizacao(df_aux), labels={'week_of_year': 'Semana do ano',
+                                                                                                                     'order_by_delivery': 'Pedidos por entregador'})
         st.plotly_chart(fig, use_container_width=True)
 
 
-with tab3:
+with tab3, mede('Mapa geográfico das entregas'):
     st.markdown('##### Mapa geográfico das entregas')
-    columns = [
-        'City',
-        'Road_traffic_density',
-        'Delivery_location_latitude',
-        'Delivery_location_longitude'
-    ]
-
-    columns_grouped = ['City', 'Road_traffic_density']
-    data_plot = df2.loc[:, columns].groupby(
-        columns_grouped).median().reset_index()
-    data_plot.columns = [
-        'Cidade', 'Densidade de tráfego', 'latitude', 'longitude']
+    data_plot = paineis.localizacao_central(df2)
 
     # Desenhar o mapa
     map_ = folium.Map(zoom_start=11)
@@ -262,3 +159,5 @@ with tab3:
                       popup=location_info[['Cidade', 'Densidade de tráfego']],
                       icon=folium.Icon(color='red', icon='info-sign')).add_to(map_)
     folium_static(map_, width=1024, height=500)
+
+mostra_registros()
@@ -0,0 +1,448 @@
+# Bibliotecas
+import functools
+import pandas as pd
+from instrumentacao import instrumenta
+
+# =============================================================
+# Agregações dos painéis de cada página do dashboard
+# =============================================================
+#
+# Todas as agregações aceitam o argumento opcional grade: colunas que entram
+# no início de cada agrupamento. As páginas não usam grade; a exportação em
+# lote usa para calcular um painel para todas as combinações de filtros em
+# uma única passada pela base.
+
+CIDADES = ['Metropolitian', 'Semi-Urban', 'Urban']
+
+
+def sem_categorias(df_aux):
+    """Converte colunas category de uma tabela agregada para object
+
+    Os gráficos do plotly express agrupam colunas category com todas as
+    categorias, inclusive as que ficaram de fora dos filtros.
+    """
+    if not isinstance(df_aux, pd.DataFrame):
+        return df_aux
+    categorias = df_aux.select_dtypes('category').columns
+    return df_aux.astype({coluna: object for coluna in categorias})
+
+
+def painel(funcao):
+    """Decorador das agregações dos painéis
+
+    Instrumenta a função, normaliza a grade (None vira lista vazia) e
+    devolve as tabelas sem colunas category.
+    """
+    @instrumenta(funcao.__name__)
+    @functools.wraps(funcao)
+    def envoltorio(df2, grade=None):
+        retorno = funcao(df2, list(grade or []))
+        if isinstance(retorno, dict):
+            return {chave: sem_categorias(valor)
+                    for chave, valor in retorno.items()}
+        return sem_categorias(retorno)
+    return envoltorio
+
+
+def total_por_grade(df_aux, coluna, grade):
+    """Total de uma coluna, por combinação da grade quando houver grade"""
+    if not grade:
+        return df_aux[coluna].sum()
+    return df_aux.groupby(grade, observed=True)[coluna].transform('sum')
+
+
+# =======================================================
+#  VISÃO EMPRESA
+# =======================================================
+
+@painel
+def pedidos_por_dia(df2, grade):
+    """Quantidade de pedidos por dia
+
+    Args:
+        df2 (dataframe): dataframe filtrado
+        grade (list): colunas extras de agrupamento
+
+    Returns:
+        dataframe: colunas Order_Date e qtd_entregas
+    """
+    df_aux = df2[grade + ['Order_Date', 'ID']].groupby(
+        grade + ['Order_Date'], observed=True).count().reset_index()
+    df_aux.columns = grade + ['Order_Date', 'qtd_entregas']
+    return df_aux
+
+
+@painel
+def pedidos_por_trafego(df2, grade):
+    """Quantidade e percentual de pedidos por densidade de tráfego
+
+    Args:
+        df2 (dataframe): dataframe filtrado
+        grade (list): colunas extras de agrupamento
+
+    Returns:
+        dataframe: colunas Road_traffic_density, qtd_entregas e perc_ID
+    """
+    df_aux = df2[grade + ['Road_traffic_density', 'ID']].groupby(
+        grade + ['Road_traffic_density'], observed=True).count().reset_index()
+    df_aux.columns = grade + ['Road_traffic_density', 'qtd_entregas']
+    df_aux['perc_ID'] = 100 * \
+        (df_aux['qtd_entregas']/total_por_grade(df_aux, 'qtd_entregas', grade))
+    return df_aux
+
+
+@painel
+def pedidos_por_trafego_cidade(df2, grade):
+    """Quantidade e percentual de pedidos por cidade e densidade de tráfego
+
+    Args:
+        df2 (dataframe): dataframe filtrado
+        grade (list): colunas extras de agrupamento
+
+    Returns:
+        dataframe: colunas Road_traffic_density, City, qtd_entregas e perc_ID
+    """
+    df_aux = df2[grade + ['Road_traffic_density', 'City', 'ID']].groupby(
+        grade + ['City', 'Road_traffic_density'], observed=True).count().reset_index()
+    df_aux.columns = grade + ['Road_traffic_density', 'City', 'qtd_entregas']
+    df_aux['perc_ID'] = 100 * \
+        (df_aux['qtd_entregas']/total_por_grade(df_aux, 'qtd_entregas', grade))
+    return df_aux
+
+
+@painel
+def pedidos_por_semana(df2, grade):
+    """Quantidade de pedidos por semana do ano
+
+    Args:
+        df2 (dataframe): dataframe filtrado
+        grade (list): colunas extras de agrupamento
+
+    Returns:
+        dataframe: colunas week_of_year e qtd_entregas
+    """
+    df_aux = df2[grade + ['week_of_year', 'ID']].groupby(
+        grade + ['week_of_year'], observed=True).count().reset_index()
+    df_aux.columns = grade + ['week_of_year', 'qtd_entregas']
+    return df_aux
+
+
+@painel
+def pedidos_por_entregador_semana(df2, grade):
+    """Quantidade de pedidos por entregador em cada semana do ano
+
+    Args:
+        df2 (dataframe): dataframe filtrado
+        grade (list): colunas extras de agrupamento
+
+    Returns:
+        dataframe: colunas week_of_year, ID, Delivery_person_ID e order_by_delivery
+    """
+    df_aux1 = df2.loc[:, grade + ['ID', 'week_of_year']].groupby(
+        grade + ['week_of_year'], observed=True).count().reset_index()
+    df_aux2 = df2.loc[:, grade + ['Delivery_person_ID', 'week_of_year']].groupby(
+        grade + ['week_of_year'], observed=True).nunique().reset_index()
+    df_aux = pd.merge(df_aux1, df_aux2, how='inner')
+    df_aux['order_by_delivery'] = df_aux['ID'] / \
+        df_aux['Delivery_person_ID']
+    return df_aux
+
+
+@painel
+def localizacao_central(df2, grade):
+    """Localização central das entregas por cidade e densidade de tráfego
+
+    Args:
+        df2 (dataframe): dataframe filtrado
+        grade (list): colunas extras de agrupamento
+
+    Returns:
+        dataframe: colunas Cidade, Densidade de tráfego, latitude e longitude
+    """
+    columns = [
+        'City',
+        'Road_traffic_density',
+        'Delivery_location_latitude',
+        'Delivery_location_longitude'
+    ]
+
+    columns_grouped = ['City', 'Road_traffic_density']
+    data_plot = df2.loc[:, grade + columns].groupby(
+        grade + columns_grouped, observed=True).median().reset_index()
+    data_plot.columns = grade + [
+        'Cidade', 'Densidade de tráfego', 'latitude', 'longitude']
+    return data_plot
+
+
+# =======================================================
+#  VISÃO ENTREGADORES
+# =======================================================
+
+@painel
+def metricas_entregadores(df2, grade):
+    """Métricas gerais dos entregadores
+
+    Args:
+        df2 (dataframe): dataframe filtrado
+        grade (list): colunas extras de agrupamento
+
+    Returns:
+        dict: maior e menor idade, melhor e pior condição de veículo (com
+              grade, um dataframe com uma linha por combinação)
+    """
+    if grade:
+        return df2.groupby(grade, observed=True).agg(
+            maior_idade=('Delivery_person_Age', 'max'),
+            menor_idade=('Delivery_person_Age', 'min'),
+            melhor_veiculo=('Vehicle_condition', 'max'),
+            pior_veiculo=('Vehicle_condition', 'min')).reset_index()
+    return {'maior_idade': df2['Delivery_person_Age'].max(),
+            'menor_idade': df2['Delivery_person_Age'].min(),
+            'melhor_veiculo': df2['Vehicle_condition'].max(),
+            'pior_veiculo': df2['Vehicle_condition'].min()}
+
+
+@painel
+def avaliacao_por_entregador(df2, grade):
+    """Avaliação média de cada entregador, da maior para a menor
+
+    Args:
+        df2 (dataframe): dataframe filtrado
+        grade (list): colunas extras de agrupamento
+
+    Returns:
+        dataframe: colunas Delivery_person_ID e Avaliacao media
+    """
+    cols = ['Delivery_person_ID', 'Delivery_person_Ratings']
+    df_aux = df2.loc[:, grade + cols].groupby(
+        grade + ['Delivery_person_ID'], observed=True).mean().reset_index()
+    df_aux.columns = grade + ['Delivery_person_ID', 'Avaliacao media']
+    return df_aux.sort_values(grade + ['Avaliacao media'],
+                              ascending=[True] * len(grade) + [False])
+
+
+def avaliacao_por_categoria(df2, coluna, grade):
+    """Avaliação média e desvio padrão por categoria
+
+    Args:
+        df2 (dataframe): dataframe filtrado
+        coluna (str): coluna categórica usada no agrupamento
+        grade (list): colunas extras de agrupamento
+
+    Returns:
+        dataframe: colunas coluna, Avaliacao media e Avaliacao std
+    """
+    cols = [coluna, 'Delivery_person_Ratings']
+    df_aux = df2.loc[:, grade + cols].groupby(grade + [coluna], observed=True).agg(
+        {'Delivery_person_Ratings': ['mean', 'std']})
+    df_aux.columns = ['Avaliacao media', 'Avaliacao std']
+    df_aux = df_aux.reset_index()
+    return df_aux.sort_values(grade + ['Avaliacao media'],
+                              ascending=[True] * len(grade) + [False])
+
+
+@painel
+def avaliacao_por_trafego(df2, grade):
+    """Avaliação média e desvio padrão por densidade de tráfego"""
+    return avaliacao_por_categoria(df2, 'Road_traffic_density', grade)
+
+
+@painel
+def avaliacao_por_clima(df2, grade):
+    """Avaliação média e desvio padrão por condição climática"""
+    return avaliacao_por_categoria(df2, 'Weatherconditions', grade)
+
+
+def top_entregadores(df2, ascending, grade):
+    """Os 10 entregadores mais rápidos ou mais lentos de cada cidade
+
+    Args:
+        df2 (dataframe): dataframe filtrado
+        ascending (bool): True para os mais rápidos, False para os mais lentos
+        grade (list): colunas extras de agrupamento
+
+    Returns:
+        dataframe: colunas City, Delivery_person_ID e tempo_medio
+    """
+    cols = ['City', 'Delivery_person_ID', 'Time_taken(min)']
+    df_aux = df2.loc[:, grade + cols].groupby(grade + ['City', 'Delivery_person_ID'], observed=True).agg({
+        'Time_taken(min)': ['mean']})
+    df_aux.columns = ['tempo_medio']
+    df_aux = df_aux.reset_index().sort_values(
+        grade + ['City', 'tempo_medio'],
+        ascending=[True] * len(grade) + [ascending, ascending])
+
+    # 10 primeiros de cada cidade, com as cidades na ordem de CIDADES
+    df_aux = df_aux.loc[df_aux['City'].isin(CIDADES), :]
+    df_aux = df_aux.groupby(grade + ['City'], observed=True, sort=False).head(10)
+    df_aux = df_aux.sort_values(grade + ['City'], kind='stable')
+    return df_aux.reset_index(drop=True)
+
+
+@painel
+def entregadores_mais_rapidos(df2, grade):
+    """Os 10 entregadores mais rápidos de cada cidade"""
+    return top_entregadores(df2, ascending=True, grade=grade)
+
+
+@painel
+def entregadores_mais_lentos(df2, grade):
+    """Os 10 entregadores mais lentos de cada cidade"""
+    return top_entregadores(df2, ascending=False, grade=grade)
+
+
+# =======================================================
+#  VISÃO RESTAURANTES
+# =======================================================
+
+@painel
+def metricas_restaurantes(df2, grade):
+    """Métricas gerais dos restaurantes
+
+    Args:
+        df2 (dataframe): dataframe filtrado
+        grade (list): colunas extras de agrupamento
+
+    Returns:
+        dict: quantidade de entregadores, distância média e tempo de entrega
+              (média e desvio padrão) com e sem festival (com grade, um
+              dataframe com uma linha por combinação)
+    """
+    df_aux = df2.loc[:, grade + ['Festival', 'Time_taken(min)']].groupby(
+        grade + ['Festival'], observed=True).agg({'Time_taken(min)': ['mean', 'std']})
+    df_aux.columns = ['tempo_medio', 'tempo_std']
+    if grade:
+        tempos = df_aux.unstack('Festival')
+        tempos.columns = [('festival_' if festival == 'Yes' else 'nao_festival_')
+                          + medida for medida, festival in tempos.columns]
+        metricas = df2.groupby(grade, observed=True).agg(
+            entregadores=('Delivery_person_ID', 'nunique'),
+            distancia_media=('distancia', 'mean'))
+        metricas['distancia_media'] = metricas['distancia_media'].astype(
+            'float64').round(2)
+        return metricas.join(tempos).reset_index()
+    df_aux = df_aux.reset_index()
+    return {'entregadores': len(df2['Delivery_person_ID'].unique()),
+            'distancia_media': round(float(df2['distancia'].mean()), 2),
+            'festival': df_aux.loc[df_aux['Festival'] == 'Yes', :],
+            'nao_festival': df_aux.loc[df_aux['Festival'] == 'No', :]}
+
+
+def tempo_por_categoria(df2, colunas, grade):
+    """Tempo médio e desvio padrão de entrega por categoria
+
+    Args:
+        df2 (dataframe): dataframe filtrado
+        colunas (list): colunas categóricas usadas no agrupamento
+        grade (list): colunas extras de agrupamento
+
+    Returns:
+        dataframe: colunas de agrupamento, tempo_medio e tempo_std
+    """
+    df_aux = df2.loc[:, grade + colunas + ['Time_taken(min)']].groupby(
+        grade + colunas, observed=True).agg({'Time_taken(min)': ['mean', 'std']})
+    df_aux.columns = ['tempo_medio', 'tempo_std']
+    df_aux = df_aux.reset_index()
+    return df_aux
+
+
+@painel
+def tempo_por_cidade(df2, grade):
+    """Tempo médio e desvio padrão de entrega por cidade"""
+    return tempo_por_categoria(df2, ['City'], grade)
+
+
+@painel
+def tempo_por_cidade_trafego(df2, grade):
+    """Tempo médio e desvio padrão de entrega por cidade e tráfego"""
+    return tempo_por_categoria(df2, ['City', 'Road_traffic_density'], grade)
+
+
+@painel
+def tempo_por_tipo_pedido(df2, grade):
+    """Tempo médio e desvio padrão de entrega por tipo de pedido"""
+    return tempo_por_categoria(df2, ['Type_of_order'], grade)
+
+
+@painel
+def distancia_por_cidade(df2, grade):
+    """Distância média das entregas por cidade
+
+    Args:
+        df2 (dataframe): dataframe filtrado
+        grade (list): colunas extras de agrupamento
+
+    Returns:
+        dataframe: colunas City e distancia
+    """
+    return df2.loc[:, grade + ['City', 'distancia']].groupby(
+        grade + ['City'], observed=True).mean().reset_index()
+
+
+@painel
+def distribuicao_tipo_pedido(df2, grade):
+    """Proporção de pedidos por tipo de pedido
+
+    Args:
+        df2 (dataframe): dataframe filtrado
+        grade (list): colunas extras de agrupamento
+
+    Returns:
+        dataframe: colunas Type_of_order, ID e pct_type_order
+    """
+    df_aux = df2.loc[:, grade + ['Type_of_order', 'ID']].groupby(
+        grade + ['Type_of_order'], observed=True).count().reset_index()
+    df_aux['pct_type_order'] = df_aux['ID'] / \
+        total_por_grade(df_aux, 'ID', grade)
+    return df_aux
+
+
+@painel
+def tempo_previsto_por_cidade_trafego(df2, grade):
+    """Tempo médio real e previsto por cidade e densidade de tráfego
+
+    Fica fora de PAINEIS porque depende da coluna tempo_previsto, calculada
+    pelo modelo de previsao.py.
+
+    Args:
+        df2 (dataframe): dataframe filtrado com a coluna tempo_previsto
+        grade (list): colunas extras de agrupamento
+
+    Returns:
+        dataframe: colunas City, Road_traffic_density, tempo_real e
+                   tempo_previsto
+    """
+    colunas = ['City', 'Road_traffic_density']
+    df_aux = df2.loc[:, grade + colunas + ['Time_taken(min)', 'tempo_previsto']].groupby(
+        grade + colunas, observed=True).mean().reset_index()
+    df_aux.columns = grade + colunas + ['tempo_real', 'tempo_previsto']
+    return df_aux
+
+
+# Painéis de cada página, usados pelos benchmarks e pela exportação em lote
+PAINEIS = {
+    'empresa': {
+        'pedidos_por_dia': pedidos_por_dia,
+        'pedidos_por_trafego': pedidos_por_trafego,
+        'pedidos_por_trafego_cidade': pedidos_por_trafego_cidade,
+        'pedidos_por_semana': pedidos_por_semana,
+        'pedidos_por_entregador_semana': pedidos_por_entregador_semana,
+        'localizacao_central': localizacao_central,
+    },
+    'entregadores': {
+        'metricas_entregadores': metricas_entregadores,
+        'avaliacao_por_entregador': avaliacao_por_entregador,
+        'avaliacao_por_trafego': avaliacao_por_trafego,
+        'avaliacao_por_clima': avaliacao_por_clima,
+        'entregadores_mais_rapidos': entregadores_mais_rapidos,
+        'entregadores_mais_lentos': entregadores_mais_lentos,
+    },
+    'restaurantes': {
+        'metricas_restaurantes': metricas_restaurantes,
+        'tempo_por_cidade': tempo_por_cidade,
+        'tempo_por_cidade_trafego': tempo_por_cidade_trafego,
+        'distancia_por_cidade': distancia_por_cidade,
+        'tempo_por_tipo_pedido': tempo_por_tipo_pedido,
+        'distribuicao_tipo_pedido': distribuicao_tipo_pedido,
+    },
+}
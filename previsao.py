@@ -0,0 +1,324 @@
+# Bibliotecas
+import os
+import json
+import math
+import time
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pandas as pd
+from instrumentacao import instrumenta
+
+# =============================================================
+# Previsão do tempo de entrega
+# =============================================================
+#
+# Regressão linear com regularização ridge, treinada só com NumPy sobre as
+# variáveis já tratadas da base. As variáveis numéricas são padronizadas e
+# as categóricas entram como one-hot. O treino calcula as médias, os desvios,
+# X'X e X'y lote a lote, então a memória de trabalho depende do tamanho do
+# lote e não do tamanho da base.
+#
+# O modelo é salvo em json como uma tabela de pesos: um peso por variável
+# numérica e um peso por categoria. A previsão em lote soma os pesos
+# buscados pelos códigos das categorias, sem montar a matriz one-hot, e a
+# previsão de um pedido é uma soma de poucos números em Python puro.
+#
+# Uso:
+#   python previsao.py treina --saida modelos/tempo_entrega.json
+#   python previsao.py servidor --porta 8765
+#   curl -d '{"distancia": 5.2, "Road_traffic_density": "Jam"}' localhost:8765
+
+MODELO = os.environ.get('CURY_MODELO', 'modelos/tempo_entrega.json')
+
+ALVO = 'Time_taken(min)'
+NUMERICAS = ['distancia', 'multiple_deliveries', 'Delivery_person_Ratings']
+CATEGORICAS = ['Road_traffic_density', 'Weatherconditions', 'Type_of_vehicle',
+               'Festival']
+
+TAMANHO_LOTE = 100_000
+
+# Modelo carregado por este processo: (caminho e data do arquivo, modelo)
+_carregado = (None, None)
+
+
+def _codigos(serie, categorias):
+    """Posição de cada valor da série na lista de categorias (-1 se ausente)"""
+    categorias = pd.Index(categorias, dtype=object)
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        posicoes = categorias.get_indexer(serie.cat.categories.astype(object))
+        codigos = serie.cat.codes.to_numpy()
+        return np.where(codigos >= 0, posicoes[codigos], -1)
+    return categorias.get_indexer(np.asarray(serie, dtype=object))
+
+
+def _atributos(df, categorias, medias, desvios):
+    """Matriz de atributos de um lote: numéricas padronizadas e one-hot
+
+    Args:
+        df (dataframe): lote com as colunas de NUMERICAS e CATEGORICAS
+        categorias (dict): categorias de cada coluna categórica
+        medias (array): média de cada coluna numérica
+        desvios (array): desvio padrão de cada coluna numérica
+
+    Returns:
+        array: matriz linhas x atributos
+    """
+    numericas = df[NUMERICAS].to_numpy(dtype=np.float64)
+    numericas = np.where(np.isnan(numericas), medias, numericas)
+    blocos = [(numericas - medias) / desvios]
+    for coluna in CATEGORICAS:
+        one_hot = np.zeros((len(df), len(categorias[coluna])))
+        codigos = _codigos(df[coluna], categorias[coluna])
+        linhas = np.flatnonzero(codigos >= 0)
+        one_hot[linhas, codigos[linhas]] = 1.0
+        blocos.append(one_hot)
+    return np.hstack(blocos)
+
+
+@instrumenta('previsao.treino')
+def treina_modelo(df2, alpha=1.0, tamanho_lote=TAMANHO_LOTE):
+    """Treina a regressão ridge do tempo de entrega
+
+    Args:
+        df2 (dataframe): base tratada (ou compacta)
+        alpha (float): força da regularização
+        tamanho_lote (int): linhas por lote no acúmulo de X'X e X'y
+
+    Returns:
+        dict: modelo (pesos por variável numérica e por categoria)
+    """
+    # Categorias, médias e desvios das numéricas, lote a lote (as somas são
+    # deslocadas pela média do primeiro lote para não perder precisão)
+    categorias = {coluna: set() for coluna in CATEGORICAS}
+    deslocamento = None
+    contagem = soma = soma_quadrados = 0
+    for inicio in range(0, len(df2), tamanho_lote):
+        lote = df2.iloc[inicio:inicio + tamanho_lote]
+        for coluna in CATEGORICAS:
+            categorias[coluna].update(lote[coluna].dropna().unique().tolist())
+        numericas = lote[NUMERICAS].to_numpy(dtype=np.float64)
+        if deslocamento is None:
+            deslocamento = np.nan_to_num(np.nanmean(numericas, axis=0))
+        numericas = numericas - deslocamento
+        contagem = contagem + np.count_nonzero(~np.isnan(numericas), axis=0)
+        soma = soma + np.nansum(numericas, axis=0)
+        soma_quadrados = soma_quadrados + np.nansum(numericas ** 2, axis=0)
+    categorias = {coluna: sorted(valores)
+                  for coluna, valores in categorias.items()}
+    medias = deslocamento + soma / contagem
+    desvios = np.sqrt(np.maximum(soma_quadrados / contagem
+                                 - (soma / contagem) ** 2, 0))
+    desvios[desvios == 0] = 1.0
+
+    # Soma de X, X'X, X'y e y, lote a lote
+    qtd = len(medias) + sum(len(valores) for valores in categorias.values())
+    soma_x = np.zeros(qtd)
+    xtx = np.zeros((qtd, qtd))
+    xty = np.zeros(qtd)
+    soma_y = 0.0
+    for inicio in range(0, len(df2), tamanho_lote):
+        lote = df2.iloc[inicio:inicio + tamanho_lote]
+        x = _atributos(lote, categorias, medias, desvios)
+        y = lote[ALVO].to_numpy(dtype=np.float64)
+        soma_x += x.sum(axis=0)
+        xtx += x.T @ x
+        xty += x.T @ y
+        soma_y += y.sum()
+
+    # Centraliza X e y para não regularizar o intercepto
+    n = len(df2)
+    media_x = soma_x / n
+    media_y = soma_y / n
+    xtx_c = xtx - n * np.outer(media_x, media_x)
+    xty_c = xty - n * media_x * media_y
+    pesos = np.linalg.solve(xtx_c + alpha * np.eye(qtd), xty_c)
+    intercepto = media_y - media_x @ pesos
+
+    modelo = {'alvo': ALVO, 'alpha': alpha, 'linhas': n,
+              'intercepto': float(intercepto), 'numericas': {},
+              'categoricas': {}}
+    for i, coluna in enumerate(NUMERICAS):
+        modelo['numericas'][coluna] = {'media': float(medias[i]),
+                                       'desvio': float(desvios[i]),
+                                       'peso': float(pesos[i])}
+    posicao = len(NUMERICAS)
+    for coluna in CATEGORICAS:
+        valores = categorias[coluna]
+        modelo['categoricas'][coluna] = dict(
+            zip(valores, pesos[posicao:posicao + len(valores)].tolist()))
+        posicao += len(valores)
+    return modelo
+
+
+@instrumenta('previsao.lote')
+def preve_tempo(df, modelo, tamanho_lote=TAMANHO_LOTE):
+    """Tempo de entrega previsto para cada pedido, em lotes
+
+    Categorias que não existiam no treino e números vazios não contribuem
+    para a previsão (equivalem à média do treino).
+
+    Args:
+        df (dataframe): pedidos com as colunas de NUMERICAS e CATEGORICAS
+        modelo (dict): modelo retornado por treina_modelo
+        tamanho_lote (int): linhas por lote
+
+    Returns:
+        array: tempo previsto em minutos
+    """
+    previsto = np.empty(len(df))
+    pesos = {}
+    for coluna, tabela in modelo['categoricas'].items():
+        categorias = list(tabela)
+        pesos[coluna] = (categorias,
+                         np.append(np.fromiter(tabela.values(), float,
+                                               len(tabela)), 0.0))
+    for inicio in range(0, len(df), tamanho_lote):
+        lote = df.iloc[inicio:inicio + tamanho_lote]
+        soma = np.full(len(lote), modelo['intercepto'])
+        for coluna, info in modelo['numericas'].items():
+            valores = lote[coluna].to_numpy(dtype=np.float64)
+            contribuicao = info['peso'] * (valores - info['media']) / info['desvio']
+            soma += np.nan_to_num(contribuicao)
+        for coluna, (categorias, tabela) in pesos.items():
+            # o código -1 (categoria desconhecida) aponta para o peso zero
+            soma += tabela[_codigos(lote[coluna], categorias)]
+        previsto[inicio:inicio + len(lote)] = soma
+    return previsto
+
+
+def preve_pedido(pedido, modelo):
+    """Tempo de entrega previsto para um único pedido
+
+    Args:
+        pedido (dict): valores das colunas de NUMERICAS e CATEGORICAS
+                       (colunas ausentes não contribuem)
+        modelo (dict): modelo retornado por treina_modelo
+
+    Returns:
+        float: tempo previsto em minutos
+    """
+    tempo = modelo['intercepto']
+    for coluna, info in modelo['numericas'].items():
+        valor = pedido.get(coluna)
+        if valor is None or math.isnan(float(valor)):
+            continue
+        tempo += info['peso'] * (float(valor) - info['media']) / info['desvio']
+    for coluna, tabela in modelo['categoricas'].items():
+        tempo += tabela.get(pedido.get(coluna), 0.0)
+    return tempo
+
+
+def avalia_modelo(df, modelo):
+    """Erros da previsão em uma base com o tempo real
+
+    Returns:
+        dict: erro absoluto médio e raiz do erro quadrático médio (minutos)
+    """
+    erro = preve_tempo(df, modelo) - df[ALVO].to_numpy(dtype=np.float64)
+    return {'mae': float(np.abs(erro).mean()),
+            'rmse': float(np.sqrt((erro ** 2).mean()))}
+
+
+def salva_modelo(modelo, arquivo=MODELO):
+    """Salva o modelo em json"""
+    pasta = os.path.dirname(arquivo)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    with open(arquivo, 'w') as f:
+        json.dump(modelo, f, indent=2)
+
+
+def carrega_modelo(arquivo=MODELO):
+    """Modelo salvo, reaproveitado pelo processo enquanto o arquivo não mudar
+
+    Args:
+        arquivo (str): caminho do json do modelo
+
+    Returns:
+        dict: modelo, ou None se ainda não houver modelo treinado
+    """
+    global _carregado
+    if not os.path.exists(arquivo):
+        return None
+    versao = (arquivo, os.path.getmtime(arquivo))
+    if _carregado[0] != versao:
+        with open(arquivo) as f:
+            _carregado = (versao, json.load(f))
+    return _carregado[1]
+
+
+class ServidorPrevisao(BaseHTTPRequestHandler):
+    """Endpoint local de previsão: POST com um pedido em json
+
+    Responde {"tempo_previsto": minutos}. A conexão é mantida entre
+    requisições (HTTP/1.1) e sem o algoritmo de Nagle, que atrasaria cada
+    resposta em dezenas de milissegundos, então o custo de cada previsão é
+    só o da leitura do json e da soma dos pesos.
+    """
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    modelo = None
+
+    def do_POST(self):
+        try:
+            tamanho = int(self.headers.get('Content-Length', 0))
+            pedido = json.loads(self.rfile.read(tamanho))
+            corpo = {'tempo_previsto': preve_pedido(pedido, self.modelo)}
+            status = 200
+        except (ValueError, TypeError, AttributeError) as erro:
+            corpo = {'erro': str(erro)}
+            status = 400
+        resposta = json.dumps(corpo).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(resposta)))
+        self.end_headers()
+        self.wfile.write(resposta)
+
+    def log_message(self, *args):
+        pass
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Modelo de previsão do tempo de entrega')
+    comandos = parser.add_subparsers(dest='comando', required=True)
+
+    treino = comandos.add_parser('treina', help='treina e salva o modelo')
+    treino.add_argument('--dados', default='dados/')
+    treino.add_argument('--arquivo', default='train.csv')
+    treino.add_argument('--saida', default=MODELO)
+    treino.add_argument('--alpha', type=float, default=1.0)
+    treino.add_argument('--teste', type=float, default=0.2,
+                        help='proporção dos pedidos separada para avaliação')
+
+    servidor = comandos.add_parser('servidor',
+                                   help='serve previsões de pedidos por http')
+    servidor.add_argument('--modelo', default=MODELO)
+    servidor.add_argument('--host', default='127.0.0.1')
+    servidor.add_argument('--porta', type=int, default=8765)
+    args = parser.parse_args()
+
+    if args.comando == 'treina':
+        from funcoes import carrega_dataframe, tratamento_dataframe
+
+        df2 = tratamento_dataframe(carrega_dataframe(args.dados, args.arquivo))
+        teste = np.random.default_rng(42).random(len(df2)) < args.teste
+        inicio = time.perf_counter()
+        modelo = treina_modelo(df2.loc[~teste, :], args.alpha)
+        modelo['tempo_treino'] = time.perf_counter() - inicio
+        modelo['avaliacao'] = avalia_modelo(df2.loc[teste, :], modelo)
+        salva_modelo(modelo, args.saida)
+        print(f"Modelo treinado com {modelo['linhas']} pedidos em "
+              f"{modelo['tempo_treino']:.2f}s; teste: "
+              f"MAE {modelo['avaliacao']['mae']:.2f} min, "
+              f"RMSE {modelo['avaliacao']['rmse']:.2f} min")
+        print(f'Modelo salvo em {args.saida}')
+    else:
+        ServidorPrevisao.modelo = carrega_modelo(args.modelo)
+        if ServidorPrevisao.modelo is None:
+            parser.error(f'Modelo não encontrado: {args.modelo}')
+        print(f'Servindo previsões em http://{args.host}:{args.porta}')
+        ThreadingHTTPServer((args.host, args.porta),
+                            ServidorPrevisao).serve_forever()
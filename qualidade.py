@@ -0,0 +1,161 @@
+# Bibliotecas
+import os
+import argparse
+import numpy as np
+from instrumentacao import mede
+
+# =============================================================
+# Regras de qualidade dos dados
+# =============================================================
+#
+# O tratamento retira os dados faltantes marcados por textos ('NaN ',
+# 'conditions NaN'), mas não valores numéricos impossíveis: coordenadas em
+# (0, 0) ou com o sinal trocado, que geram distâncias de milhares de km,
+# avaliações fora da escala e idades impossíveis. As regras abaixo são
+# declarativas (tipo, colunas e limites) e cada uma é avaliada como uma
+# operação sobre colunas inteiras, sem percorrer as linhas.
+#
+# As linhas rejeitadas saem da base e podem ser gravadas em um arquivo de
+# quarentena, com o nome das regras que cada uma violou.
+#
+# Uso:
+#   python qualidade.py --arquivo train.csv --quarentena dados/quarentena.csv
+
+QUARENTENA = os.environ.get('CURY_QUARENTENA')
+
+RESTAURANTE = ['Restaurant_latitude', 'Restaurant_longitude']
+ENTREGA = ['Delivery_location_latitude', 'Delivery_location_longitude']
+
+# Regras: nome -> (tipo, colunas, limites)
+#   'zero': todas as colunas iguais a zero
+#   'negativo': alguma coluna menor que zero
+#   'faixa': alguma coluna fora do intervalo [mínimo, máximo] (vazios passam)
+REGRAS = {
+    'restaurante_em_zero': ('zero', RESTAURANTE, None),
+    'entrega_em_zero': ('zero', ENTREGA, None),
+    'coordenada_negativa': ('negativo', RESTAURANTE + ENTREGA, None),
+    'distancia_fora_da_faixa': ('faixa', ['distancia'], (0, 50)),
+    'avaliacao_fora_da_faixa': ('faixa', ['Delivery_person_Ratings'], (1, 5)),
+    'idade_fora_da_faixa': ('faixa', ['Delivery_person_Age'], (18, 65)),
+}
+
+
+def avalia_regra(df, tipo, colunas, limites=None):
+    """Linhas que violam uma regra
+
+    Args:
+        df (dataframe): dataframe com as colunas da regra já numéricas
+        tipo (str): 'zero', 'negativo' ou 'faixa'
+        colunas (list): colunas avaliadas
+        limites (tuple): mínimo e máximo da regra 'faixa'
+
+    Returns:
+        array: máscara booleana das linhas que violam a regra
+    """
+    valores = [df[coluna].to_numpy() for coluna in colunas]
+    if tipo == 'zero':
+        return np.logical_and.reduce([v == 0 for v in valores])
+    if tipo == 'negativo':
+        return np.logical_or.reduce([v < 0 for v in valores])
+    if tipo == 'faixa':
+        minimo, maximo = limites
+        return np.logical_or.reduce([(v < minimo) | (v > maximo)
+                                     for v in valores])
+    raise ValueError(f'Tipo de regra desconhecido: {tipo}')
+
+
+def avalia_regras(df, regras=REGRAS):
+    """Regras violadas por cada linha
+
+    Args:
+        df (dataframe): dataframe com as colunas das regras
+        regras (dict): regras no formato de REGRAS
+
+    Returns:
+        array: código de cada linha, com o bit i ligado se a i-ésima regra
+               foi violada (zero para as linhas válidas)
+    """
+    codigos = np.zeros(len(df), dtype=np.uint32)
+    for bit, regra in enumerate(regras.values()):
+        codigos |= avalia_regra(df, *regra).astype(np.uint32) << bit
+    return codigos
+
+
+def nomes_regras(codigos, regras=REGRAS):
+    """Nomes das regras violadas, separados por '|', para cada código"""
+    nomes = list(regras)
+    unicos, posicao = np.unique(codigos, return_inverse=True)
+    textos = np.array(['|'.join(nome for bit, nome in enumerate(nomes)
+                                if codigo >> bit & 1)
+                       for codigo in unicos], dtype=object)
+    return textos[posicao]
+
+
+def valida_dataframe(df, regras=REGRAS):
+    """Separa as linhas que violam alguma regra de qualidade
+
+    Args:
+        df (dataframe): dataframe tratado
+        regras (dict): regras no formato de REGRAS
+
+    Returns:
+        tuple: dataframe válido, dataframe rejeitado (com a coluna regras) e
+               dicionário com a quantidade de linhas que violam cada regra
+               (uma linha pode violar mais de uma) e o total rejeitado
+    """
+    with mede('qualidade', df) as medida:
+        codigos = avalia_regras(df, regras)
+        relatorio = {nome: int(np.count_nonzero(codigos >> bit & 1))
+                     for bit, nome in enumerate(regras)}
+        rejeitada = codigos != 0
+        relatorio['total'] = int(np.count_nonzero(rejeitada))
+
+        df_valido = df.loc[~rejeitada, :]
+        df_rejeitado = df.loc[rejeitada, :].assign(
+            regras=nomes_regras(codigos[rejeitada], regras))
+        medida['saida'] = df_valido
+        medida['rejeicoes'] = relatorio
+    return df_valido, df_rejeitado, relatorio
+
+
+def grava_quarentena(df_rejeitado, arquivo):
+    """Grava as linhas rejeitadas em um csv de quarentena
+
+    Args:
+        df_rejeitado (dataframe): linhas rejeitadas por valida_dataframe
+        arquivo (str): caminho do csv (sobrescrito a cada carga)
+    """
+    pasta = os.path.dirname(arquivo)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    df_rejeitado.to_csv(arquivo, index=False)
+
+
+def imprime_relatorio(relatorio, linhas):
+    """Imprime a quantidade de linhas rejeitadas por regra
+
+    Args:
+        relatorio (dict): relatório retornado por valida_dataframe
+        linhas (int): quantidade de linhas avaliadas
+    """
+    for nome, quantidade in relatorio.items():
+        print(f'{nome:<28}{quantidade:>10}{100 * quantidade / max(linhas, 1):>8.2f}%')
+
+
+if __name__ == '__main__':
+    from funcoes import carrega_dataframe, tratamento_dataframe
+
+    parser = argparse.ArgumentParser(
+        description='Relatório de qualidade dos dados de pedidos')
+    parser.add_argument('--dados', default='dados/')
+    parser.add_argument('--arquivo', default='train.csv')
+    parser.add_argument('--quarentena', default=QUARENTENA)
+    args = parser.parse_args()
+
+    df1 = carrega_dataframe(args.dados, args.arquivo)
+    df2 = tratamento_dataframe(df1, validar=False)
+    _, df_rejeitado, relatorio = valida_dataframe(df2)
+    imprime_relatorio(relatorio, len(df2))
+    if args.quarentena:
+        grava_quarentena(df_rejeitado, args.quarentena)
+        print(f'Linhas rejeitadas gravadas em {args.quarentena}')
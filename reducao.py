@@ -0,0 +1,136 @@
+# Bibliotecas
+import numpy as np
+import pandas as pd
+
+# =============================================================
+# Redução do volume de dados enviados ao navegador
+# =============================================================
+#
+# Séries temporais longas são reduzidas para no máximo MAX_PONTOS pontos
+# (LTTB para linhas, mínimo/máximo por faixa para barras), gráficos com
+# muitos pontos usam WebGL e tabelas grandes são paginadas no servidor,
+# então o tamanho enviado ao navegador não depende do tamanho da base.
+
+MAX_PONTOS = 2000
+LIMITE_SVG = 1000
+TAMANHO_PAGINA = 100
+
+
+def _numerico(valores):
+    """Converte uma coluna (inclusive datas) para float64"""
+    valores = pd.Series(valores)
+    if pd.api.types.is_datetime64_any_dtype(valores):
+        return valores.to_numpy(dtype='datetime64[ns]').view(
+            'int64').astype('float64')
+    return valores.to_numpy(dtype='float64')
+
+
+def lttb(x, y, limite):
+    """Índices dos pontos escolhidos pelo Largest-Triangle-Three-Buckets
+
+    Mantém o primeiro e o último ponto e, em cada faixa intermediária, o
+    ponto que forma o maior triângulo com o ponto escolhido na faixa
+    anterior e a média da faixa seguinte.
+
+    Args:
+        x (array): eixo x ordenado
+        y (array): eixo y
+        limite (int): quantidade máxima de pontos
+
+    Returns:
+        array: índices dos pontos mantidos, em ordem crescente
+    """
+    x = _numerico(x)
+    y = _numerico(y)
+    n = len(x)
+    if limite >= n or limite < 3:
+        return np.arange(n)
+
+    bordas = np.linspace(1, n - 1, limite - 1).astype(int)
+    indices = np.empty(limite, dtype=int)
+    indices[0] = 0
+    indices[-1] = n - 1
+    anterior = 0
+    for i in range(limite - 2):
+        inicio, fim = bordas[i], bordas[i + 1]
+        prox_inicio = fim
+        prox_fim = bordas[i + 2] if i + 2 < len(bordas) else n
+        media_x = x[prox_inicio:prox_fim].mean()
+        media_y = y[prox_inicio:prox_fim].mean()
+        area = np.abs((x[anterior] - media_x) * (y[inicio:fim] - y[anterior])
+                      - (x[anterior] - x[inicio:fim]) * (media_y - y[anterior]))
+        anterior = inicio + int(np.argmax(area))
+        indices[i + 1] = anterior
+    return indices
+
+
+def minmax(y, limite):
+    """Índices do mínimo e do máximo de cada faixa da série
+
+    Args:
+        y (array): eixo y, na ordem do eixo x
+        limite (int): quantidade máxima de pontos
+
+    Returns:
+        array: índices dos pontos mantidos, em ordem crescente
+    """
+    n = len(y)
+    if limite >= n or limite < 2:
+        return np.arange(n)
+
+    faixas = np.arange(n) * (limite // 2) // n
+    valores = pd.Series(_numerico(y))
+    grupos = valores.groupby(faixas)
+    return np.unique(np.concatenate([grupos.idxmin().to_numpy(),
+                                     grupos.idxmax().to_numpy()]))
+
+
+def reduz_serie(df_aux, x, y, limite=MAX_PONTOS, metodo='lttb'):
+    """Reduz uma série temporal para no máximo limite pontos
+
+    Args:
+        df_aux (dataframe): série ordenada pela coluna x
+        x (str): coluna do eixo x
+        y (str): coluna do eixo y
+        limite (int): quantidade máxima de pontos
+        metodo (str): 'lttb' para linhas ou 'minmax' para barras
+
+    Returns:
+        dataframe: linhas mantidas da série
+    """
+    if len(df_aux) <= limite:
+        return df_aux
+    df_aux = df_aux.sort_values(x).reset_index(drop=True)
+    if metodo == 'lttb':
+        indices = lttb(df_aux[x], df_aux[y], limite)
+    elif metodo == 'minmax':
+        indices = minmax(df_aux[y], limite)
+    else:
+        raise ValueError(f'Método de redução desconhecido: {metodo}')
+    return df_aux.iloc[indices].reset_index(drop=True)
+
+
+def modo_renderizacao(df_aux):
+    """Modo de renderização do px.line: WebGL para séries com muitos pontos"""
+    return 'webgl' if len(df_aux) > LIMITE_SVG else 'auto'
+
+
+def total_paginas(df_aux, tamanho=TAMANHO_PAGINA):
+    """Quantidade de páginas de um dataframe (no mínimo uma)"""
+    return max(1, -(-len(df_aux) // tamanho))
+
+
+def pagina_dataframe(df_aux, pagina, tamanho=TAMANHO_PAGINA):
+    """Recorta uma página de um dataframe já ordenado
+
+    Args:
+        df_aux (dataframe): dataframe completo
+        pagina (int): número da página, começando em 1
+        tamanho (int): linhas por página
+
+    Returns:
+        dataframe: linhas da página
+    """
+    pagina = min(max(pagina, 1), total_paginas(df_aux, tamanho))
+    inicio = (pagina - 1) * tamanho
+    return df_aux.iloc[inicio:inicio + tamanho]